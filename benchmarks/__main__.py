@@ -0,0 +1,55 @@
+"""
+Run the benchmark suite.
+
+Usage::
+
+    python -m benchmarks                                  # print the results as JSON
+    python -m benchmarks --output baseline.json           # save them
+    python -m benchmarks --baseline baseline.json         # compare with a saved baseline (exit code 1 on regressions)
+    python -m benchmarks render. --repeat 3               # only the cases starting with "render."
+"""
+import argparse
+import json
+import sys
+
+from .suite import CASES, compare, dumps, run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Component tags benchmark suite.')
+    parser.add_argument('cases', nargs='*', help=f'case name prefixes, available: {", ".join(CASES)}')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions per case (the best one is compared)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per repetition')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, repeat=args.repeat, min_time=args.min_time)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(dumps(results))
+
+    if not args.baseline:
+        if not args.output:
+            sys.stdout.write(dumps(results))
+        return 0
+
+    with open(args.baseline) as baseline:
+        rows, regressions = compare(results, json.load(baseline), args.threshold)
+
+    print(f'{"case":<24} {"baseline (us)":>14} {"current (us)":>14} {"change":>8}')
+    for name, previous, current, change in rows:
+        previous = '-' if previous is None else f'{previous:.2f}'
+        change = '-' if change is None else f'{change:+.1%}'
+        print(f'{name:<24} {previous:>14} {current:>14.2f} {change:>8}')
+
+    if regressions:
+        print(f'\nRegressions (> {args.threshold:.0%}): {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
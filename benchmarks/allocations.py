@@ -0,0 +1,99 @@
+"""
+Memory allocations per component render.
+
+Renders a tree of nested components and reports, per component render, the number of template context
+copies and the peak memory traced by tracemalloc while rendering the whole tree.
+
+Usage::
+
+    python -m benchmarks.allocations [--depth 5] [--width 4] [--repeat 20]
+"""
+import argparse
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.template import Context
+from django.template.context import BaseContext
+
+from .common import make_engine
+
+
+def make_source(depth: int, width: int) -> str:
+    if depth == 0:
+        return ''
+    child = make_source(depth - 1, width)
+    return ''.join(
+        '{%% box title="Level %d" id=id %%}%s{%% endbox %%}' % (depth, child) for _ in range(width)
+    )
+
+
+def count_components(depth: int, width: int) -> int:
+    return sum(width ** level for level in range(1, depth + 1))
+
+
+@contextmanager
+def count_copies():
+    """
+    Count the calls to ``copy(context)`` (also used by ``context.new()``)
+    """
+    counter = {'copies': 0}
+    original = BaseContext.__copy__
+
+    def __copy__(self):
+        counter['copies'] += 1
+        return original(self)
+
+    BaseContext.__copy__ = __copy__
+    try:
+        yield counter
+    finally:
+        BaseContext.__copy__ = original
+
+
+def measure(depth: int = 5, width: int = 4, repeat: int = 20) -> dict:
+    engine = make_engine()
+    source = engine.from_string(make_source(depth, width))
+    renders = count_components(depth, width) * repeat
+
+    # Warm up caches (templates, meta, references)
+    source.render(Context({'id': 'foo'}))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        source.render(Context({'id': 'foo'}))
+    elapsed = time.perf_counter() - start
+
+    with count_copies() as counter:
+        for _ in range(repeat):
+            source.render(Context({'id': 'foo'}))
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        source.render(Context({'id': 'foo'}))
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        'components': renders // repeat,
+        'context_copies_per_render': round(counter['copies'] / renders, 2),
+        'peak_kib': round(peak / 1024, 1),
+        'us_per_render': round(elapsed / renders * 1e6, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--width', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for key, value in measure(args.depth, args.width, args.repeat).items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Standalone django setup and components shared by the benchmarks (no project settings, database or network).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=['component_tags'],
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'APP_DIRS': True}],
+        USE_I18N=False,
+    )
+    django.setup()
+
+from django.template import Engine  # noqa: E402
+
+from component_tags import template  # noqa: E402
+
+register = template.Library()
+
+TEMPLATES = {
+    'box.html': '<div {{ attributes }}><h1>{{ title }}</h1>{{ nodelist }}</div>',
+    'button.html': '<button {{ attributes }}>{{ label }}{{ nodelist }}</button>',
+    'card.html': '<div class="card">{% if slot_header %}<header>{{ slot_header }}</header>{% endif %}'
+                 '<section>{{ nodelist }}</section>'
+                 '{% if slot_footer %}<footer>{{ slot_footer }}</footer>{% endif %}</div>',
+    'asset.html': '<i>{{ nodelist }}</i>',
+    'include_box.html': '<div class="{{ color|default:"gray" }}" id="{{ id }}"><h1>{{ title }}</h1></div>',
+    'inclusion_box.html': '<div class="{{ color }}" id="{{ id }}"><h1>{{ title }}</h1></div>',
+}
+
+
+@register.tag
+class Box(template.Component):
+    title = template.Attribute(as_context=True)
+    color = template.Attribute(default='gray', as_class=True)
+
+    class Meta:
+        template_name = 'box.html'
+        css = {'all': ['box.css']}
+
+
+@register.tag
+class Button(template.Component):
+    class ColorChoices(template.AttributeChoices):
+        primary = 'btn-primary'
+        secondary = 'btn-secondary'
+        danger = 'btn-danger'
+
+    class SizeChoices(template.AttributeChoices):
+        sm = 'btn-sm'
+        md = 'btn-md'
+        lg = 'btn-lg'
+
+    color = template.Attribute(choices=ColorChoices, default=ColorChoices.primary, as_class=True)
+    size = template.Attribute(choices=SizeChoices, default=SizeChoices.md, as_class=True)
+    outline = template.Attribute(as_class=True)
+    href = template.Attribute(default='#', context_name='data-href')
+    target = template.Attribute(default='_self')
+    role = template.Attribute(default='button')
+    tabindex = template.Attribute(default=0)
+    label = template.Attribute(as_context=True)
+
+    class Meta:
+        template_name = 'button.html'
+        js = ['button.js']
+
+
+@register.tag
+class Card(template.Component):
+    class Meta:
+        template_name = 'card.html'
+        css = {'all': ['card.css']}
+
+
+@register.inclusion_tag('inclusion_box.html')
+def inclusion_box(title, id, color='gray'):
+    return {'title': title, 'id': id, 'color': color}
+
+
+def make_asset_components(count: int):
+    """
+    Register "count" component classes ("asset_0", "asset_1", ...) with their own media
+    """
+    for index in range(count):
+        name = f'asset_{index}'
+        if name in register.tags:
+            continue
+        meta = type('Meta', (), {
+            'template_name': 'asset.html',
+            'css': {'all': [f'asset_{index}.css', 'common.css']},
+            'js': ['common.js', f'asset_{index}.js'],
+        })
+        register.tag(name, type(name.title(), (template.Component,), {'Meta': meta, '__module__': __name__}))
+
+
+def make_engine(templates: dict = None):
+    engine = Engine(loaders=[
+        ('django.template.loaders.locmem.Loader', dict(TEMPLATES, **(templates or {}))),
+        'django.template.loaders.app_directories.Loader',
+    ], builtins=['component_tags.template.builtins'])
+    engine.template_builtins.append(register)
+    return engine
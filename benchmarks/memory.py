@@ -0,0 +1,78 @@
+"""
+Memory held by compiled component templates.
+
+Compiles N distinct templates (each one using several components with attributes, options and slots) and reports
+the memory traced by tracemalloc and the growth of the resident set size, per 1000 compiled templates.
+
+Usage::
+
+    python -m benchmarks.memory [--templates 1000] [--components 10]
+"""
+import argparse
+import gc
+import os
+import resource
+import tracemalloc
+
+from .common import make_engine
+
+
+def get_rss() -> int:
+    """
+    Resident set size of the current process in bytes (current value on linux, peak value elsewhere)
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def make_source(index: int, components: int) -> str:
+    return ''.join(
+        '{%% box title="Box %d" color="blue" id=id with index=%d %%}'
+        '{%% slot "footer" %%}Footer %d{%% endslot %%}Body {{ index }}{%% endbox %%}' % (i, index, i)
+        for i in range(components)
+    )
+
+
+def measure(templates: int = 1000, components: int = 10) -> dict:
+    engine = make_engine()
+    engine.from_string(make_source(0, 1))
+
+    gc.collect()
+    rss = get_rss()
+    tracemalloc.start()
+
+    compiled = [engine.from_string(make_source(index, components)) for index in range(templates)]
+
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss = get_rss() - rss
+
+    scale = 1000 / templates
+    nodes = templates * components
+    del compiled
+
+    return {
+        'templates': templates,
+        'components': nodes,
+        'traced_kib_per_1000_templates': round(traced * scale / 1024, 1),
+        'rss_kib_per_1000_templates': round(rss * scale / 1024, 1),
+        'traced_bytes_per_component': round(traced / nodes, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=1000)
+    parser.add_argument('--components', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for key, value in measure(args.templates, args.components).items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
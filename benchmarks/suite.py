@@ -0,0 +1,196 @@
+"""
+Benchmarks of the component render hot path.
+
+Every case is a function returning the operation to time and the number of components (units) handled by it,
+the results are reported per call and per unit so they can be compared with the ``{% include %}`` and
+``inclusion_tag`` baselines.
+"""
+import json
+import platform
+import statistics
+import time
+from typing import Callable, Dict, Tuple
+
+import django
+from django.template import Context
+
+from .common import make_asset_components, make_engine
+
+from component_tags.template.metrics import MetricsRecorder, PrometheusExporter  # noqa: E402 (after the setup)
+from component_tags.template.observers import observing  # noqa: E402
+
+CASES: Dict[str, Callable[[], Tuple[Callable[[], object], int]]] = {}
+
+ITEMS = 200
+
+
+def case(name: str):
+    def decorator(func):
+        CASES[name] = func
+        return func
+    return decorator
+
+
+def render_case(source: str, units: int, **values):
+    engine = make_engine()
+    compiled = engine.from_string(source)
+    return lambda: compiled.render(Context(values)), units
+
+
+def nested_source(depth: int, width: int) -> str:
+    if depth == 0:
+        return '{{ id }}'
+    child = nested_source(depth - 1, width)
+    return ''.join('{%% box title="%d.%d" id=id %%}%s{%% endbox %%}' % (depth, i, child) for i in range(width))
+
+
+@case('parse.components')
+def parse_components():
+    engine = make_engine()
+    source = ''.join(
+        '{%% card with index=%d %%}{%% slot "header" %%}{%% button color="secondary" label="Open" %%}{%% endbutton %%}'
+        '{%% endslot %%}{%% box title=title id=id %%}{{ index }}{%% endbox %%}{%% endcard %%}' % i
+        for i in range(ITEMS // 4)
+    )
+    return lambda: engine.from_string(source), ITEMS // 4 * 4
+
+
+@case('render.flat')
+def render_flat():
+    return render_case('{% for i in items %}{% box title=i id=i %}{% endbox %}{% endfor %}', ITEMS,
+                       items=range(ITEMS))
+
+
+@case('render.each')
+def render_each():
+    # Same output as "render.flat", rendered as a batch
+    return render_case('{% render_each box items as i title=i id=i %}', ITEMS, items=range(ITEMS))
+
+
+@case('render.nested')
+def render_nested():
+    depth, width = 7, 2
+    return render_case(nested_source(depth, width), sum(width ** level for level in range(1, depth + 1)), id='foo')
+
+
+@case('render.attributes')
+def render_attributes():
+    return render_case(
+        '{% for i in items %}{% button color=color size="lg" outline=outline href=i target="_blank" label=i %}'
+        '{% endbutton %}{% endfor %}', ITEMS, items=range(ITEMS), color='danger', outline='btn-outline',
+    )
+
+
+@case('render.slots')
+def render_slots():
+    return render_case(
+        '{% for i in items %}{% card with i=i %}{% slot "header" %}Header {{ i }}{% endslot %}Body {{ i }}'
+        '{% slot "footer" %}Footer {{ i }}{% endslot %}{% endcard %}{% endfor %}', ITEMS * 3, items=range(ITEMS),
+    )
+
+
+@case('render.media')
+def render_media():
+    count = 100
+    make_asset_components(count)
+    source = '{% components_css %}' + ''.join(
+        '{%% asset_%d %%}{%% endasset_%d %%}' % (i, i) for i in range(count)
+    ) + '{% components_js %}'
+    return render_case(source, count)
+
+
+@case('metrics.sampled')
+def metrics_sampled():
+    # Same as "render.flat", recording the metrics of a sampled request (the unsampled requests run "render.flat")
+    render, units = render_flat()
+
+    def func():
+        with observing(MetricsRecorder(exporter)):
+            return render()
+
+    exporter = PrometheusExporter()
+    return func, units
+
+
+@case('baseline.include')
+def baseline_include():
+    return render_case('{% for i in items %}{% include "include_box.html" with title=i id=i %}{% endfor %}', ITEMS,
+                       items=range(ITEMS))
+
+
+@case('baseline.inclusion_tag')
+def baseline_inclusion_tag():
+    return render_case('{% for i in items %}{% inclusion_box i i %}{% endfor %}', ITEMS, items=range(ITEMS))
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> list:
+    """
+    Time per call (seconds) of every repetition, each repetition calls the function as many times as needed
+    to run at least "min_time" seconds
+    """
+    func()  # warm up caches
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def run(names=None, repeat: int = 5, min_time: float = 0.2) -> dict:
+    results = {}
+    for name, factory in CASES.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        func, units = factory()
+        timings = measure(func, repeat=repeat, min_time=min_time)
+        best = min(timings)
+        results[name] = {
+            'units': units,
+            'min_us': round(best * 1e6, 2),
+            'median_us': round(statistics.median(timings) * 1e6, 2),
+            'unit_us': round(best * 1e6 / units, 3),
+        }
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> Tuple[list, list]:
+    """
+    Compare the best time of every case with the baseline, returns the table rows and the names of the cases
+    slower than the baseline by more than "threshold" (e.g. 0.1 = 10%)
+    """
+    rows, regressions = [], []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            rows.append((name, None, result['min_us'], None))
+            continue
+        change = result['min_us'] / previous['min_us'] - 1
+        rows.append((name, previous['min_us'], result['min_us'], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def dumps(results: dict) -> str:
+    return json.dumps(results, indent=2, sort_keys=True) + '\n'
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...template.warmup import warm
+
+
+class Command(BaseCommand):
+    help = (
+        'Import the template libraries and load and compile the templates of every registered component, '
+        'reporting the components whose template cannot be loaded. It only validates the templates: the command '
+        'runs in its own process, so nothing is warmed for the web workers (call warm() at worker startup).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Exit with an error if the template of a component cannot be loaded.',
+        )
+
+    def handle(self, *args, **options):
+        result = warm()
+
+        for name, error in result.errors:
+            self.stderr.write(f'[{name}] {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {result.components} components ({result.templates} templates) in {result.seconds * 1000:.1f}ms'
+        ))
+
+        if options['strict'] and result.errors:
+            raise CommandError(f'{len(result.errors)} component templates could not be loaded.')
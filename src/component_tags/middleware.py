@@ -0,0 +1,130 @@
+import logging
+import os
+import random
+import re
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+
+from .template.metrics import MetricsRecorder, PrometheusExporter, get_exporter
+from .template.observers import observing
+from .template.profiling import RenderProfiler
+
+__all__ = ['ComponentProfilerMiddleware', 'ComponentMetricsMiddleware', 'metrics']
+
+logger = logging.getLogger('component_tags.profiling')
+
+
+class ComponentProfilerMiddleware:
+    """
+    Records the render time of the components used by every request (development only), see ``RenderProfiler``.
+
+    It is enabled with ``COMPONENT_TAGS_PROFILE = True``, the profile is available as ``request.component_profile``,
+    logged by the "component_tags.profiling" logger (debug level) and written as JSON and folded stacks inside
+    ``COMPONENT_TAGS_PROFILE_DIR`` (if it is defined).
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            # settings.py
+            MIDDLEWARE = [
+                ...
+                'component_tags.middleware.ComponentProfilerMiddleware',
+            ]
+
+            COMPONENT_TAGS_PROFILE = DEBUG
+            COMPONENT_TAGS_PROFILE_DIR = BASE_DIR / 'profiles'
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'COMPONENT_TAGS_PROFILE', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = getattr(settings, 'COMPONENT_TAGS_PROFILE_DIR', None)
+
+    def __call__(self, request):
+        with observing(RenderProfiler()) as profiler:
+            request.component_profile = profiler
+            response = self.get_response(request)
+
+        if profiler.entries:
+            logger.debug('%s %s: %.3fms rendering components', request.method, request.path, profiler.total * 1000,
+                         extra={'profile': profiler.to_dict()})
+            if self.directory:
+                self.save(request, profiler)
+
+        return response
+
+    def save(self, request, profiler: RenderProfiler):
+        """
+        Write the profile as <time>-<path>.json and <time>-<path>.folded
+        """
+        path = re.sub(r'[^\w.-]+', '-', request.path).strip('-') or 'index'
+        now = time.time()
+        timestamp = '%s-%03d' % (time.strftime('%Y%m%d-%H%M%S', time.localtime(now)), now * 1000 % 1000)
+        name = os.path.join(str(self.directory), f'{timestamp}-{path}')
+
+        os.makedirs(str(self.directory), exist_ok=True)
+        with open(f'{name}.json', 'w') as output:
+            output.write(profiler.to_json(indent=2))
+        with open(f'{name}.folded', 'w') as output:
+            output.write(profiler.folded())
+
+
+class ComponentMetricsMiddleware:
+    """
+    Records the component render metrics of a sample of the requests (production), see ``MetricsRecorder``.
+
+    ``COMPONENT_TAGS_METRICS_SAMPLE_RATE`` is the fraction of the requests recorded (e.g. ``0.01``), it is disabled
+    by default. Requests not sampled are only checked with a single random draw. The metrics are handed to the
+    exporter (``COMPONENT_TAGS_METRICS_EXPORTER``) once the response is returned.
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            # settings.py
+            MIDDLEWARE = [
+                ...
+                'component_tags.middleware.ComponentMetricsMiddleware',
+            ]
+
+            COMPONENT_TAGS_METRICS_SAMPLE_RATE = 0.01
+            COMPONENT_TAGS_SLOW_RENDER_MS = 50
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = float(getattr(settings, 'COMPONENT_TAGS_METRICS_SAMPLE_RATE', 0))
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with observing(MetricsRecorder()) as recorder:
+            response = self.get_response(request)
+
+        recorder.flush()
+        return response
+
+
+def metrics(request):
+    """
+    View exposing the metrics of the in-memory exporter in the Prometheus text format
+
+    .. code-block:: python
+
+        # urls.py
+        path('metrics/components', component_tags.middleware.metrics),
+    """
+    exporter = get_exporter()
+    if not isinstance(exporter, PrometheusExporter):
+        raise Http404('Component metrics are not exported in memory.')
+    return HttpResponse(exporter.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
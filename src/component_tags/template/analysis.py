@@ -0,0 +1,193 @@
+from typing import FrozenSet, Optional
+from weakref import WeakKeyDictionary
+
+from django.template import defaulttags, loader_tags
+from django.template.base import FilterExpression, Node, NodeList, Template, TextNode, Variable, VariableNode
+from django.template.library import InclusionNode, SimpleNode
+from django.template.smartif import TokenBase
+from django.templatetags import cache, i18n, l10n, static, tz
+
+from .media import MediaNode
+from .plan import literal_value
+
+__all__ = ['get_references', 'is_referenced', 'is_stateful', 'register_node']
+
+
+class UnknownReferences(Exception):
+    """
+    Raised when the context variables used by a node cannot be known before rendering it
+    """
+    pass
+
+
+def _node_classes(module, *names):
+    # Some tags are not available in every django version (e.g. "ifequal")
+    return [getattr(module, name) for name in names if hasattr(module, name)]
+
+
+# Nodes that only access the context through their template expressions and child nodes
+SAFE_NODES = frozenset([
+    TextNode,
+    VariableNode,
+    *_node_classes(
+        defaulttags, 'AutoEscapeControlNode', 'CommentNode', 'CsrfTokenNode', 'CycleNode', 'FilterNode',
+        'FirstOfNode', 'ForNode', 'IfChangedNode', 'IfEqualNode', 'IfNode', 'LoremNode', 'RegroupNode', 'LoadNode',
+        'NowNode', 'ResetCycleNode', 'SpacelessNode', 'TemplateTagNode', 'URLNode', 'VerbatimNode',
+        'WidthRatioNode', 'WithNode',
+    ),
+    *_node_classes(loader_tags, 'BlockNode'),
+    *_node_classes(cache, 'CacheNode'),
+    *_node_classes(
+        i18n, 'GetAvailableLanguagesNode', 'GetLanguageInfoNode', 'GetLanguageInfoListNode', 'GetCurrentLanguageNode',
+        'GetCurrentLanguageBidiNode', 'TranslateNode', 'LanguageNode',
+    ),
+    *_node_classes(l10n, 'LocalizeNode'),
+    *_node_classes(static, 'PrefixNode', 'StaticNode'),
+    *_node_classes(tz, 'LocalTimeNode', 'TimezoneNode', 'GetCurrentTimezoneNode'),
+])
+
+# Same as above, including subclasses
+SAFE_BASES = [MediaNode]
+
+# Nodes keeping state between renders inside the render context (e.g. the current value of "cycle")
+STATEFUL_NODES = tuple(_node_classes(defaulttags, 'CycleNode', 'IfChangedNode'))
+
+_references = WeakKeyDictionary()
+_slots = {}
+
+
+def register_node(node_class):
+    """
+    Declare a node class (and its subclasses) that only accesses the context through its template expressions
+    and child nodes, therefore the references of templates using it can be known before rendering.
+    """
+    if node_class not in SAFE_BASES:
+        SAFE_BASES.append(node_class)
+    return node_class
+
+
+def get_references(template: Template) -> Optional[FrozenSet[str]]:
+    """
+    Get the names of the context variables referenced by the template (e.g. "nodelist" or "slot_footer"),
+    or None if they cannot be known before rendering it (e.g. custom tags with access to the whole context).
+
+    The result is computed once per compiled template.
+    """
+    try:
+        return _references[template]
+    except KeyError:
+        pass
+
+    names = set()
+    try:
+        _find_template(template, names, set())
+        references = frozenset(names)
+    except UnknownReferences:
+        references = None
+
+    _references[template] = references
+    return references
+
+
+def is_referenced(name: str, references: Optional[FrozenSet[str]]) -> bool:
+    """
+    Check if the context variable could be used by the template, based on its references
+    """
+    return references is None or name in references
+
+
+def is_stateful(*nodes) -> bool:
+    """
+    Check if the nodes (or nodelists) keep state between renders, so their output could depend on the previous
+    renders of the same nodes.
+    """
+    return any(node.get_nodes_by_type(STATEFUL_NODES) for node in nodes)
+
+
+def _find_template(template: Template, names: set, seen: set):
+    if template in seen:
+        return
+    seen.add(template)
+    _find_nodelist(template.nodelist, template.engine, names, seen)
+
+
+def _find_nodelist(nodelist, engine, names: set, seen: set):
+    for node in nodelist:
+        _find_node(node, engine, names, seen)
+
+
+def _find_node(node: Node, engine, names: set, seen: set):
+    node_class = type(node)
+
+    if node_class is loader_tags.ExtendsNode:
+        _find_loaded(node.parent_name, engine, names, seen)
+    elif node_class is loader_tags.IncludeNode:
+        _find_loaded(node.template, engine, names, seen)
+    elif node_class in (SimpleNode, InclusionNode):
+        if node.takes_context:
+            raise UnknownReferences(node)
+    elif node_class not in SAFE_NODES and not isinstance(node, tuple(SAFE_BASES)):
+        raise UnknownReferences(node)
+
+    _find_value(getattr(node, '__dict__', None), engine, names, seen)
+    for name in _get_slots(node_class):
+        _find_value(getattr(node, name, None), engine, names, seen)
+
+
+def _get_slots(cls) -> tuple:
+    """
+    Names of the values stored as slots by the class and its superclasses (they are not part of __dict__)
+    """
+    try:
+        return _slots[cls]
+    except KeyError:
+        pass
+
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+
+    _slots[cls] = names = tuple(name for name in names if name not in ('__dict__', '__weakref__'))
+    return names
+
+
+def _find_loaded(template_name, engine, names: set, seen: set):
+    """
+    Find the references of the extended/included template, it can only be done if its name is a literal
+    """
+    template_name = literal_value(template_name)
+
+    if not isinstance(template_name, str):
+        raise UnknownReferences(template_name)
+
+    try:
+        template = engine.get_template(template_name)
+    except Exception:
+        raise UnknownReferences(template_name)
+
+    _find_template(template, names, seen)
+
+
+def _find_value(value, engine, names: set, seen: set):
+    if isinstance(value, FilterExpression):
+        _find_value(value.var, engine, names, seen)
+        for func, args in value.filters:
+            for lookup, arg in args:
+                _find_value(arg, engine, names, seen)
+    elif isinstance(value, Variable):
+        if value.lookups:
+            names.add(value.lookups[0])
+    elif isinstance(value, Node):
+        _find_node(value, engine, names, seen)
+    elif isinstance(value, NodeList):
+        _find_nodelist(value, engine, names, seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _find_value(item, engine, names, seen)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _find_value(item, engine, names, seen)
+    elif isinstance(value, TokenBase):
+        # "if" conditions
+        _find_value(value.__dict__, engine, names, seen)
@@ -0,0 +1,130 @@
+import asyncio
+from typing import Optional, Union
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.template import Context
+from django.template.context import RenderContext, make_context
+from django.template.loader import get_template
+from django.utils.safestring import SafeString
+
+__all__ = ['AsyncDataLoader', 'NOT_LOADED', 'arender', 'get_async_loader']
+
+ASYNC_LOADER_CONTEXT_KEY = '__component_tags__async_loader'
+
+# Context data of a component not loaded yet, the component is rendered on the next pass
+NOT_LOADED = object()
+
+
+class AsyncDataLoader:
+    """
+    Context data of the components defining ``aget_context_data``, loaded concurrently between the rendering passes
+    of ``arender()``. Components are identified by their node and their number of renders during the pass.
+
+    Attributes
+    ----------
+    loaded: dict
+        context data returned by ``aget_context_data``
+    pending: dict
+        coroutines of the components without data, awaited by ``load()``
+    rounds: int
+        number of times the pending data was loaded
+    """
+
+    def __init__(self):
+        self.loaded = {}
+        self.pending = {}
+        self.rounds = 0
+        self._renders = {}
+
+    def start(self):
+        """
+        Start a rendering pass
+        """
+        self._renders.clear()
+
+    def get(self, node, values: dict):
+        """
+        Context data of the component, NOT_LOADED if it is not loaded yet (it is loaded by the next ``load()``)
+        """
+        index = self._renders.get(id(node), 0)
+        self._renders[id(node)] = index + 1
+        key = (id(node), index)
+
+        try:
+            return self.loaded[key]
+        except KeyError:
+            pass
+
+        if key not in self.pending:
+            self.pending[key] = node.aget_context_data(values)
+        return NOT_LOADED
+
+    async def load(self):
+        """
+        Await every pending coroutine concurrently
+        """
+        pending, self.pending = self.pending, {}
+        results = await asyncio.gather(*pending.values())
+        self.loaded.update(zip(pending.keys(), results))
+        self.rounds += 1
+
+
+def get_async_loader(context) -> Optional[AsyncDataLoader]:
+    """
+    Data loader of the current ``arender()`` pass, stored inside the root render context, if any
+    """
+    return context.render_context.dicts[0].get(ASYNC_LOADER_CONTEXT_KEY)
+
+
+def load_context_data(node, context, values: dict):
+    """
+    Context data of the component node (``aget_context_data``), outside ``arender()`` the coroutine is run
+    synchronously.
+    """
+    loader = get_async_loader(context)
+    if loader is None:
+        return async_to_sync(node.aget_context_data)(values)
+    return loader.get(node, values)
+
+
+async def arender(template, context: Optional[Union[dict, Context]] = None, request=None) -> SafeString:
+    """
+    Render the template (name, backend template or ``django.template.Template``), awaiting the
+    ``aget_context_data`` coroutines of the components concurrently.
+
+    The template is rendered (in a thread, like any other synchronous code) until every component has its data:
+    components without data are skipped, their coroutines are awaited together and the template is rendered again
+    (components rendered by the templates of the loaded components are loaded by the next pass).
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            async def dashboard(request):
+                return HttpResponse(await arender('dashboard.html', {'widgets': widgets}, request=request))
+    """
+    if isinstance(template, str):
+        template = await sync_to_async(get_template)(template)
+
+    # backends.django.Template
+    if hasattr(template, 'template'):
+        context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+        template = template.template
+    elif not isinstance(context, Context):
+        context = make_context(context, request, autoescape=template.engine.autoescape)
+
+    loader = AsyncDataLoader()
+    render = sync_to_async(template.render)
+
+    while True:
+        # Every pass starts with a clean render state (e.g. render memo, media and cycles)
+        context.render_context = RenderContext()
+        context.render_context.dicts[0][ASYNC_LOADER_CONTEXT_KEY] = loader
+        loader.start()
+
+        output = await render(context)
+        if not loader.pending:
+            return output
+
+        await loader.load()
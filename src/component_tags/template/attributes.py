@@ -1,9 +1,10 @@
 from enum import Enum
-from typing import Optional, Union
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Union
 
 from django.template.base import Variable, FilterExpression, VariableDoesNotExist
 
-__all__ = ['Attribute']
+__all__ = ['Attribute', 'BoundAttribute']
 
 
 class ChoiceDoesNotExist(Exception):
@@ -109,6 +110,8 @@ class Attribute:
         {% endbutton %}
     """
 
+    __slots__ = ('context_name', 'choices', '_choice_names', 'required', '_default', 'as_class', 'as_context')
+
     ChoiceDoesNotExist = ChoiceDoesNotExist
     VariableDoesNotExist = VariableDoesNotExist
     RequiredValue = RequiredValue
@@ -124,6 +127,11 @@ class Attribute:
             raise RequiredValue("choices must be Enum's subclass")
 
         self.choices = choices
+
+        # Formatted choices by member name, computed once so resolving a choice is a dict lookup
+        members = choices.__members__.items() if choices else ()
+        self._choice_names = MappingProxyType({key: format(member) for key, member in members})
+
         self.required = required
         self.default = default
         self.as_class = as_class
@@ -154,18 +162,21 @@ class Attribute:
             raise_exception = self.required
 
         try:
-            # noinspection PyCallingNonCallable,PyArgumentList
-            return format(key if isinstance(key, self.choices) else self.choices[key])
-        except (KeyError, ValueError):
+            # Members are looked up by name (hashing enum members is slower)
+            if type(key) is self.choices:
+                key = key._name_
+            return self._choice_names[key]
+        except KeyError:
             if raise_exception:
                 raise ChoiceDoesNotExist(f'{key} is not an available choice, choices are: {self.get_member_choices()}')
 
-    def check_value(self, value, raise_exception: bool = False):
+    def check_value(self, value, raise_exception: bool = False, name: Optional[str] = None):
         """
-        Verify if the current value is valid based on different criteria
+        Verify if the current value is valid based on different criteria, "name" identifies the attribute inside
+        the error messages (the context name of the bound attribute)
         """
         if self.required and value is None:
-            raise RequiredValue(f'{self.context_name} should be different than null')
+            raise RequiredValue(f'{name or self.context_name} should be different than null')
         return self.get_choice(value, raise_exception) if self.choices else value
 
     def set_context_name(self, value: str):
@@ -231,11 +242,30 @@ class Attribute:
         """
         self.context_name = value
 
-    def resolve(self, value: Union[Variable, FilterExpression, str], context, raise_exception: bool = True):
+    def resolve(self, value: Union[Variable, FilterExpression, str], context, raise_exception: bool = True,
+                name: Optional[str] = None):
         """
         Resolves the template variable/expression specified as an argument, then checks if the value can be used.
         """
         try:
-            return self.check_value(value.resolve(context), raise_exception=raise_exception)
+            return self.check_value(value.resolve(context), raise_exception=raise_exception, name=name)
         except VariableDoesNotExist as ex:
             raise self.VariableDoesNotExist(ex)
+
+
+class BoundAttribute(NamedTuple):
+    """
+    Attribute declared inside a component class, with its context name already resolved.
+
+    Attributes
+    ----------
+    name: str
+        name used to declare the attribute inside the component class (and as template tag argument)
+    context_name: str
+        name used to identify it inside the context
+    attribute: Attribute
+        the attribute definition (shared by every instance of the component)
+    """
+    name: str
+    context_name: str
+    attribute: Attribute
@@ -0,0 +1,85 @@
+from typing import Iterator
+
+from django.template import Context, TemplateSyntaxError
+from django.template.base import FilterExpression, Node, NodeList
+from django.utils.safestring import SafeString
+
+from .analysis import register_node
+from .nodes import BaseComponent, ComponentNode
+from .parser import parse_arguments
+
+__all__ = ['RenderEachNode', 'render_each']
+
+
+@register_node
+class RenderEachNode(Node):
+    """
+    Render a component once per item of a sequence, see ``ComponentNode.iter_each``
+
+    Attributes
+    ----------
+    component: ComponentNode
+        component node rendered for every item
+    sequence: FilterExpression
+        items to render
+    item_name: str
+        name of the item inside the parent context (attribute and option expressions) and the component context
+    """
+
+    child_nodelists = ('nodelist',)
+
+    def __init__(self, component: ComponentNode, sequence: FilterExpression, item_name: str):
+        self.component = component
+        self.sequence = sequence
+        self.item_name = item_name
+        # Component found by the nodelist traversals (e.g. media prediction of streamed templates)
+        self.nodelist = NodeList([component])
+
+    def __repr__(self):
+        return f'<{type(self).__name__}: {self.component.tag_name} for {self.item_name} in {self.sequence}>'
+
+    def render(self, context: Context) -> SafeString:
+        return SafeString(''.join(self.stream(context)))
+
+    def stream(self, context: Context) -> Iterator[str]:
+        # Same as ForNode
+        items = self.sequence.resolve(context, ignore_failures=True)
+        if items is None:
+            items = []
+        yield from self.component.iter_each(context, items, self.item_name)
+
+
+def render_each(parser, token):
+    """
+    Render a component once per item, the component schema, template and media are resolved once for every item.
+    The item is available inside the attribute and "with" expressions, and inside the component context.
+
+    Examples
+    --------
+
+        .. code-block::
+
+            {% render_each row rows as row id=row.pk with selected=selected %}
+
+            # Same output as:
+            {% for row in rows %}{% row id=row.pk with row=row selected=selected %}{% endrow %}{% endfor %}
+    """
+    bits = token.split_contents()
+    tag_name = bits.pop(0)
+    if len(bits) < 4 or bits[2] != 'as':
+        raise TemplateSyntaxError(f"'{tag_name}' statements should use the format "
+                                  f"'{tag_name} component items as item [attributes] [with options]': {token.contents}")
+
+    component_name, sequence, _, item_name = bits[:4]
+    component = getattr(parser.tags.get(component_name), '__wrapped__', None)
+    if not isinstance(component, BaseComponent):
+        raise TemplateSyntaxError(f"'{tag_name}' tag: '{component_name}' is not a component tag")
+
+    args, kwargs, options = parse_arguments(tag_name, bits[4:], parser)
+    if args:
+        raise TemplateSyntaxError(f"'{tag_name}' tag only accepts keyword arguments after the item name")
+
+    options = dict({item_name: FilterExpression(item_name, parser)}, **options)
+    node = component(component_name, NodeList(), options, {}, **kwargs)
+    node.token = token
+    return RenderEachNode(node, parser.compile_filter(sequence), item_name)
@@ -1,4 +1,5 @@
 from . import Library
+from .batch import render_each
 from .components import Slot
 from .media import media_tag
 
@@ -8,9 +9,11 @@ Builtin tags
 * Slot: can be used inside any other component, therefore it can be pre-loaded inside django.
 * components_css: import css scripts from rendered components 
 * components_js: import js scripts from rendered components 
+* render_each: render a component once per item of a sequence
 """
 register = Library()
 
 register.tag('slot', Slot)
 register.tag("components_css", media_tag("css"))
 register.tag("components_js", media_tag("js"))
+register.tag("render_each", render_each)
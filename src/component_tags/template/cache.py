@@ -0,0 +1,361 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.forms.widgets import Media
+from django.template.base import Variable, VariableDoesNotExist
+from django.utils.safestring import SafeString
+from django.utils.timezone import get_current_timezone
+from django.utils.translation import get_language
+
+from .media import get_media_collector
+from .observers import notify_cache
+
+__all__ = ['FragmentCache', 'PureCache', 'RenderMemo', 'exclude_render', 'get_render_memo', 'make_key', 'pure_cache']
+
+KEY_PREFIX = 'component_tags'
+
+RENDER_MEMO_CONTEXT_KEY = '__component_tags_render_memo'
+
+# Values identified by their value inside the render memo, any other object is identified by itself
+VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def get_class_path(cls) -> str:
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+def make_key(node, inputs: Iterable, fragments: Iterable = (), vary: Iterable = ()) -> str:
+    """
+    Digest of everything the output of a component node depends on: component class, template, resolved
+    attributes/options, rendered nodelist/slots and extra values.
+
+    Values are identified by their ``repr()``, it should be stable across processes for objects used as
+    attributes or options (e.g. model instances).
+    """
+    parts = (node.tag_name, node.get_template_name(), tuple(inputs), tuple(fragments), tuple(vary))
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{get_class_path(type(node))}:{digest}'
+
+
+def get_fragment_digest(value) -> str:
+    return hashlib.md5(str(value).encode('utf-8')).hexdigest()
+
+
+def get_fragments(node, context) -> Tuple[Tuple[str, str], ...]:
+    """
+    Digest of the nodelist and slots stored inside the component context (they are rendered if needed)
+    """
+    values = context.dicts[-1]
+    return tuple(
+        (name, get_fragment_digest(values[name])) for name in ('nodelist', *node.slots) if name in values
+    )
+
+
+class FragmentCache:
+    """
+    Rendered output of a component, stored inside a django cache backend (declared as ``Meta.cache``).
+
+    The media added while rendering the component (e.g. by components used inside its template) is stored
+    with the output and added again on every cache hit.
+
+    Attributes
+    ----------
+    timeout: Optional[int]
+        number of seconds the output is cached, the cache backend default is used if it is not defined
+    vary_on: List[str]
+        parent context variables the output depends on (e.g. "user.pk" or "LANGUAGE_CODE"), besides the
+        component attributes, options, nodelist and slots
+    alias: str
+        cache backend used to store the output (``settings.CACHES``)
+
+    Examples
+    --------
+
+        .. code-block::
+
+            class Navbar(template.Component):
+                class Meta:
+                    template_name = 'tags/navbar.html'
+                    cache = {'timeout': 300, 'vary_on': ['user.pk', 'LANGUAGE_CODE']}
+    """
+
+    def __init__(self, timeout: Optional[int] = DEFAULT_TIMEOUT, vary_on: Iterable[str] = (),
+                 alias: str = DEFAULT_CACHE_ALIAS):
+        self.timeout = timeout
+        self.vary_on = list(vary_on)
+        self.alias = alias
+        self._variables = [Variable(name) for name in self.vary_on]
+
+    @classmethod
+    def from_options(cls, options) -> Optional['FragmentCache']:
+        """
+        Create it from the ``Meta.cache`` definition: a dict of options, True (default options) or None
+        """
+        if not options:
+            return None
+        if isinstance(options, cls):
+            return options
+        if options is True:
+            return cls()
+        return cls(**options)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def resolve_vary(self, context) -> Tuple:
+        """
+        Resolve the "vary_on" variables using the parent template context (missing variables are None)
+        """
+        values = []
+        for variable in self._variables:
+            try:
+                values.append(variable.resolve(context))
+            except VariableDoesNotExist:
+                values.append(None)
+        return tuple(values)
+
+    def render(self, node, template, context, inputs: Iterable, vary: Iterable = ()) -> SafeString:
+        """
+        Render the component template using the cached output if it exists, the nodelist and slots stored in
+        the component context are rendered first since they are part of the cache key.
+        """
+        collector = get_media_collector(context)
+
+        with collector.record() as recorded:
+            key = make_key(node, inputs, get_fragments(node, context), vary)
+
+            cached = self.backend.get(key)
+            notify_cache(node, 'fragment', cached is not None)
+            if cached is not None:
+                output, media = cached
+                for name, value in media:
+                    collector.add(name or value, value)
+                return SafeString(output)
+
+            output = template.render(context)
+
+        self.backend.set(key, (str(output), self.dump_media(recorded)), self.timeout)
+        return output
+
+    @staticmethod
+    def dump_media(recorded) -> List[Tuple[Optional[str], Media]]:
+        """
+        Media recorded while rendering, identified by the component class path (so it can be pickled)
+        """
+        return [
+            (get_class_path(key) if isinstance(key, type) else None, Media(css=media._css, js=media._js))
+            for key, media in recorded
+        ]
+
+
+class PureCache:
+    """
+    Rendered output of pure components (declared as ``Meta.pure = True``), memoized inside the current process.
+
+    Pure components are rendered the same way given the same template, active language and timezone, attributes,
+    options, nodelist and slots (e.g. icons or badges), their output is kept inside a thread-safe LRU limited by
+    number of entries and by size. The media added while rendering a component is added again on every hit.
+
+    Attributes
+    ----------
+    max_size: Optional[int]
+        maximum number of entries, ``settings.COMPONENT_TAGS_PURE_CACHE_SIZE`` is used if it is not defined
+    max_bytes: Optional[int]
+        maximum size of the stored outputs, ``settings.COMPONENT_TAGS_PURE_CACHE_BYTES`` is used if it is not
+        defined
+    """
+
+    default_max_size = 1000
+    default_max_bytes = 4 * 1024 * 1024
+
+    def __init__(self, max_size: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, 'COMPONENT_TAGS_PURE_CACHE_SIZE', self.default_max_size)
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, 'COMPONENT_TAGS_PURE_CACHE_BYTES', self.default_max_bytes)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value[0]
+
+    def set(self, key, value):
+        size = sys.getsizeof(value[0])
+        max_size, max_bytes = self.max_size, self.max_bytes
+
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+
+            if size > max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self.bytes += size
+
+            while len(self._entries) > max_size or self.bytes > max_bytes:
+                self.bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def render(self, node, template, context, inputs: Iterable) -> SafeString:
+        """
+        Render the component template using the memoized output if it exists. Only strings, numbers and ``None``
+        attributes or options are memoized (compared by type and value), components with any other value (e.g. a
+        model instance, which would be kept alive and compared by its primary key) are always rendered.
+        """
+        values = []
+        for kind, key, value in inputs:
+            if not isinstance(value, VALUE_TYPES):
+                return template.render(context)
+            values.append((kind, key, type(value), value))
+
+        collector = get_media_collector(context)
+
+        with collector.record() as recorded:
+            key = (
+                type(node), template, get_language(), get_current_timezone(), tuple(values),
+                get_fragments(node, context),
+            )
+
+            cached = self.get(key)
+            notify_cache(node, 'pure', cached is not None)
+            if cached is not None:
+                output, media = cached
+                for name, value in media:
+                    collector.add(name, value)
+                return output
+
+            output = SafeString(template.render(context))
+
+        self.set(key, (output, tuple(recorded)))
+        return output
+
+
+# Shared by every pure component
+pure_cache = PureCache()
+
+
+class RenderMemo:
+    """
+    Output of the components rendered during the current template rendering (usually a request), so the same
+    component rendered again with identical inputs reuses it (e.g. the same icon inside every table row).
+
+    Inputs are the component class, its resolved template, the active language and timezone, the resolved
+    attributes and options, and the nodelist and slots nodes (components with an empty body share their output
+    wherever they are used). Strings, numbers and ``None`` are compared by type and value (``1``, ``True`` and ``1.0``
+    are different inputs), any other object by identity (the memo keeps a reference to it).
+
+    Attributes
+    ----------
+    hits: int
+        number of renders that reused a previous output
+    misses: int
+        number of renders stored inside the memo
+    excluded: int
+        number of renders that cannot be reused (see ``exclude_render``), a component is only stored if none of
+        them happened while rendering it
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.excluded = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(node, template, inputs: Iterable) -> tuple:
+        values = tuple(
+            (kind, key, type(value), value) if isinstance(value, VALUE_TYPES) else (kind, key, None, id(value))
+            for kind, key, value in inputs
+        )
+        body = id(node) if node.nodelist or node.slots else None
+        return type(node), template, get_language(), get_current_timezone(), values, body
+
+    def get(self, key):
+        try:
+            output, media, references = self._entries[key]
+        except KeyError:
+            return None
+        self.hits += 1
+        return output, media
+
+    def set(self, key, output, media, references):
+        """
+        Store the output, references are the objects identified by their id inside the key
+        """
+        self._entries[key] = (output, media, references)
+        self.misses += 1
+
+
+def exclude_render(context):
+    """
+    Called when a component that cannot be deduplicated is rendered, so the components being rendered around it
+    (e.g. a component using it inside its template) do not store an output that would be replayed later
+    """
+    memo = context.render_context.dicts[0].get(RENDER_MEMO_CONTEXT_KEY)
+    # Without a memo no component is being stored
+    if memo is not None:
+        memo.excluded += 1
+
+
+def get_render_memo(context) -> RenderMemo:
+    """
+    Get the render memo of the current template rendering, it is stored inside the root render context like
+    the media collector.
+    """
+    root_context = context.render_context.dicts[0]
+    try:
+        return root_context[RENDER_MEMO_CONTEXT_KEY]
+    except KeyError:
+        memo = root_context[RENDER_MEMO_CONTEXT_KEY] = RenderMemo()
+        return memo
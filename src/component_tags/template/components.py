@@ -1,9 +1,29 @@
+import os
+from weakref import WeakKeyDictionary
+
+from django.template import TemplateDoesNotExist
 from django.template.base import Variable, NodeList
+from django.utils.safestring import SafeString
 
+from .media import add_media
 from .nodes import ComponentNode
+from .plan import ComponentPlan
 
 __all__ = ['Slot']
 
+# Templates shipped with the app, the inline render of slots has the same output
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Whether the slot template loaded by an engine is the shipped one, per loaded template
+_inline_templates = WeakKeyDictionary()
+
+
+def is_shipped(template) -> bool:
+    name = getattr(getattr(template, 'origin', None), 'name', None)
+    return isinstance(name, str) and os.path.dirname(os.path.realpath(name)) == os.path.join(
+        os.path.realpath(TEMPLATES_DIR), 'component_tags',
+    )
+
 
 class Slot(ComponentNode):
     """
@@ -34,8 +54,19 @@ class Slot(ComponentNode):
             # Output:
             <span>Slot 1</span>
             <button type="button"></button>
+
+    Notes
+    -----
+    Slots using the default template are rendered inline (same output, without rendering the template) while the
+    engine loads the templates shipped with the app (or cannot load them), projects overriding
+    ``component_tags/slot.html`` or ``component_tags/base.html`` render them through their templates. Set a
+    different ``Meta.template_name`` in a subclass to render them through a template.
     """
 
+    __slots__ = ('slot_name',)
+
+    inline_template_name = 'component_tags/slot.html'
+
     def __init__(self, *args, **kwargs):
         tag_name, nodelist, options, slots, name = args
         kwargs['isolated_context'] = True  # Make sure slot has the parent context
@@ -46,5 +77,54 @@ class Slot(ComponentNode):
         #  but name should be declared inside this constructor
         self.slot_name = getattr(name, 'var', None)
 
+    def render(self, context):
+        if (
+            self.get_template_name() != self.inline_template_name
+            or not self.isolated_context
+            or not self.is_inline(context)
+        ):
+            return super().render(context)
+
+        values = {}
+        for binding in self.plan.dynamic_bindings:
+            if binding.kind != ComponentPlan.CONTEXT:
+                # html attributes are formatted by the component context
+                return super().render(context)
+            values[binding.key] = binding.resolve(context)
+
+        add_media(context, self.meta, type(self))
+
+        # Same values as the component context
+        values['attributes'] = self.plan.attributes
+        if getattr(context, 'request', None) is not None:
+            values.setdefault('request', context.request)
+
+        # Same output as the default template, using an isolated frame of the context (restored afterwards)
+        dicts = context.dicts
+        context._reset_dicts(values)
+        try:
+            return SafeString('\n    %s\n' % self.nodelist.render(context))
+        finally:
+            context.dicts = dicts
+
+    def is_inline(self, context) -> bool:
+        """
+        Whether the slot template of the engine is the one shipped with the app (checked once per loaded template)
+        """
+        engine = self.get_engine(context)
+        try:
+            template = self._template_cache.get_template(engine, self.inline_template_name)
+        except TemplateDoesNotExist:
+            return True
+
+        try:
+            return _inline_templates[template]
+        except KeyError:
+            pass
+
+        inline = is_shipped(template) and is_shipped(engine.get_template('component_tags/base.html'))
+        _inline_templates[template] = inline
+        return inline
+
     class Meta:
         template_name = 'component_tags/slot.html'
@@ -2,17 +2,31 @@ from typing import Optional, Union
 
 from django.template import Context, RequestContext
 from django.template.base import NodeList
+from django.utils.safestring import SafeText
 
-from .helpers import format_attributes, format_value
+from .analysis import is_referenced
+from .helpers import ContextFrame, LazyRender, format_attributes, format_value, merge_attributes
 
 __all__ = [
     'BaseContext',
     'Context',
     'TagContext',
-    'ComponentContext'
+    'ComponentContext',
+    'make_frame',
 ]
 
 
+def make_frame(context: Context, dicts: Optional[list] = None) -> Context:
+    """
+    Shallow copy of the context sharing its render state (render context, bound template, request, ...) with other
+    values, cheaper than ``copy(context)`` which also copies the render context
+    """
+    frame = object.__new__(type(context))
+    frame.__dict__.update(context.__dict__)
+    frame.dicts = context.dicts[:] if dicts is None else dicts
+    return frame
+
+
 class BaseContext:
     """
     Context wrapper which includes a couple of methods to create the same outcome.
@@ -25,9 +39,18 @@ class BaseContext:
         extra values added to the context
     isolated: bool
         ensures that the context is isolated from the global context
+
+    Notes
+    -----
+    When ``use_frame`` is enabled, the wrapped context is a frame of the initial context (see ``make_frame``)
+    instead of a copy of it: it shares the render state, only its values are different. The initial context is
+    never modified, so ``get_context_data`` overrides still read the parent values from it.
     """
 
+    __slots__ = ('_wrap',)
+
     default_class = Context
+    use_frame = False
 
     def __init__(self, initial: Union[Context, RequestContext, None], dict_: dict, isolated: bool = True):
         if initial is None:
@@ -37,11 +60,21 @@ class BaseContext:
         else:
             raise Exception('Cannot define initial')
 
-        if isolated:
+        if self.use_frame:
+            self._wrap = make_frame(self._wrap, None if isolated else self._wrap.dicts + [dict_])
+            if isolated:
+                self._wrap._reset_dicts(dict_)
+        elif isolated:
             self._wrap = self.new(dict_)
         else:
             self.update(dict_)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def __copy__(self):
         return self._wrap.__copy__()
 
@@ -81,6 +114,12 @@ class BaseContext:
         """
         return self._wrap
 
+    def close(self):
+        """
+        Called when the context is no longer used (e.g. at the end of a ``with`` block), the initial context is never
+        modified so there is nothing to restore
+        """
+
     def flatten(self) -> dict:
         """
         Return self.dicts as one dictionary.
@@ -146,12 +185,15 @@ class TagContext(BaseContext):
         extra values added to the context
     """
 
+    __slots__ = ('_static_attributes',)
+
     default_class = RequestContext
 
     def __init__(self, attributes: Optional[dict] = None, initial: Optional[RequestContext] = None,
                  isolated: bool = False, **kwargs):
         super().__init__(initial, kwargs, isolated=isolated)
         self._attributes = {} if attributes is None else attributes
+        self._static_attributes = None
 
     @property
     def _attributes(self):
@@ -204,13 +246,32 @@ class TagContext(BaseContext):
 
         self._attributes[name] = value
 
+    def add_static_attributes(self, attributes: dict, formatted: Optional[SafeText] = None):
+        """
+        Add html attributes known before rendering (e.g. template tag literals). They are placed before the
+        attributes added inside the context, and the already formatted version is used as is when there are no
+        other attributes.
+        """
+        if formatted is None:
+            formatted = format_attributes(attributes)
+        self._static_attributes = (attributes, formatted)
+
     def make(self):
         """
         Collection of actions executed before render the component:
         - Format attributes as strings
         """
         context = super().make()
-        context['attributes'] = format_attributes(self._attributes, context)
+        attributes = self._attributes
+
+        if self._static_attributes is not None:
+            static, formatted = self._static_attributes
+            if not attributes:
+                context['attributes'] = formatted
+                return context
+            attributes = merge_attributes(static, attributes)
+
+        context['attributes'] = format_attributes(attributes, context)
         return context
 
 
@@ -228,13 +289,28 @@ class ComponentContext(TagContext):
         html attributes stored inside the context, and can be used as: {{ attributes }}
     isolated: bool
         ensures that the context is isolated from the global context
+    references: Optional[FrozenSet[str]]
+        context variables used by the component template, the nodelist is only rendered if it is used
+        (None means unknown, see ``analysis.get_references``)
     **kwargs: dict
         extra values added to the context
+
+    Notes
+    -----
+    The initial context is not copied nor modified, the component values are stored inside a frame of it
+    (see ``BaseContext.use_frame``).
     """
+
+    __slots__ = ('_nodelist', '_frame', 'references')
+
+    use_frame = True
+
     def __init__(self, nodelist: NodeList, initial: RequestContext, attributes: Optional[dict] = None,
                  isolated: bool = True, **kwargs):
         super().__init__(attributes, initial=initial, isolated=isolated, **kwargs)
         self._nodelist = nodelist
+        self._frame = None
+        self.references = None
 
         # TODO: get rid of this implementation
         # Make sure that request is part of the context
@@ -245,8 +321,19 @@ class ComponentContext(TagContext):
         """
         Collection of actions executed before render the component:
         - Format attributes as strings
-        - Render the current nodelist and store it inside the current context
+        - Store the current nodelist inside the current context, rendered on first use
         """
         context = super().make()
-        context['nodelist'] = self._nodelist.render(context)
+        if is_referenced('nodelist', self.references):
+            context['nodelist'] = self.render_lazy(self._nodelist)
         return context
+
+    def render_lazy(self, node) -> LazyRender:
+        """
+        Render the node (or nodelist) on first use, with the current context values.
+        The component template is able to change the context, therefore nodes are rendered using a frame of the
+        current values (shared by all the nodes of the component).
+        """
+        if self._frame is None:
+            self._frame = ContextFrame(self._wrap)
+        return LazyRender(node, self._frame)
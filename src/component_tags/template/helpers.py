@@ -1,12 +1,18 @@
-from typing import Optional, Union
+from typing import Callable, Iterator, Optional, Union
 
+from django.forms.widgets import Media
 from django.template import Context, RequestContext
-from django.utils.safestring import SafeText, SafeString
+from django.utils.functional import Promise
+from django.utils.safestring import SafeData, SafeText, SafeString
 
 __all__ = [
+    'ContextFrame',
+    'LazyRender',
+    'RenderedComponent',
     'format_value',
     'format_classes',
     'format_attributes',
+    'merge_attributes',
 ]
 
 
@@ -70,3 +76,204 @@ def format_attributes(properties, context=None) -> SafeText:
             elements.append(f'{key}="{value}"')
 
     return SafeText(" ".join(elements))
+
+
+def merge_attributes(*attributes: dict) -> dict:
+    """
+    Merge html attributes, the latest values are used except for "class" attributes which are joined
+    """
+    merged = {}
+    for properties in attributes:
+        for (key, value) in properties.items():
+            if key == 'class' and merged.get(key):
+                classes = merged[key] if isinstance(merged[key], list) else [merged[key]]
+                value = classes + (value if isinstance(value, list) else [value])
+            merged[key] = value
+    return merged
+
+
+class ContextFrame:
+    """
+    Values of a template context at some point of the rendering, they are restored temporarily to render a node
+    with the same values later (a lighter alternative to ``copy(context)``, only the stacks of values are copied).
+
+    The values are copied when the frame is created, so the values set afterwards (e.g. ``{% url ... as name %}``
+    inside the component template) are not visible to the node, and each node renders on top of a new dict so
+    the nodes sharing the frame do not see each other's values either.
+
+    Attributes
+    ----------
+    context: Union[Context, RequestContext]
+        template context to restore
+    """
+
+    __slots__ = ('context', 'dicts', 'render_dicts', 'render_template')
+
+    def __init__(self, context):
+        self.context = context
+        self.dicts = [dict(values) for values in context.dicts]
+        self.render_dicts = context.render_context.dicts[:]
+        self.render_template = context.render_context.template
+
+    def render(self, node) -> str:
+        context, render_context = self.context, self.context.render_context
+        saved = context.dicts, render_context.dicts, render_context.template
+
+        # New list and top dict, so the frame can be rendered again whatever the node pushes or sets
+        context.dicts = self.dicts + [{}]
+        render_context.dicts = self.render_dicts[:]
+        render_context.template = self.render_template
+        try:
+            return node.render(context)
+        finally:
+            context.dicts, render_context.dicts, render_context.template = saved
+
+    def stream(self, node, iter_node: Callable) -> Iterator[str]:
+        """
+        Same as ``render``, yielding the chunks of ``iter_node(node, context)`` (see ``streaming.iter_node``),
+        the frame values are used until the last chunk is yielded
+        """
+        context, render_context = self.context, self.context.render_context
+        saved = context.dicts, render_context.dicts, render_context.template
+
+        context.dicts = self.dicts + [{}]
+        render_context.dicts = self.render_dicts[:]
+        render_context.template = self.render_template
+        try:
+            yield from iter_node(node, context)
+        finally:
+            context.dicts, render_context.dicts, render_context.template = saved
+
+
+class LazyRender(SafeData, Promise):
+    """
+    Safe string rendered on first use (at most once), e.g. when the template evaluates ``{{ nodelist }}``
+    or ``{% if slot_footer %}``. It behaves like the rendered ``SafeString`` (e.g. with the ``first``, ``slice``
+    or ``json_script`` filters), as a ``Promise`` it is converted to string where lazy strings are (e.g. JSON).
+
+    Attributes
+    ----------
+    node: Union[Node, NodeList]
+        node/nodelist to render
+    context: Union[Context, RequestContext, ContextFrame]
+        context used to render it, it should not change after creating this object (e.g. a copy or a frame)
+    """
+
+    def __init__(self, node, context):
+        self._node = node
+        self._context = context
+        self._rendered = None
+
+    @property
+    def rendered(self) -> bool:
+        return self._rendered is not None
+
+    def render(self) -> SafeString:
+        if self._rendered is None:
+            if isinstance(self._context, ContextFrame):
+                rendered = self._context.render(self._node)
+            else:
+                rendered = self._node.render(self._context)
+            self._rendered = SafeString(rendered)
+            self._node = self._context = None
+        return self._rendered
+
+    def stream(self, iter_node: Callable) -> Iterator[str]:
+        """
+        Yield the output in chunks (see ``streaming.iter_node``), it is kept as if it was rendered
+        """
+        if self._rendered is None:
+            if isinstance(self._context, ContextFrame):
+                chunks = self._context.stream(self._node, iter_node)
+            else:
+                chunks = iter_node(self._node, self._context)
+
+            rendered = []
+            for chunk in chunks:
+                rendered.append(chunk)
+                yield chunk
+            self._rendered = SafeString(''.join(rendered))
+            self._node = self._context = None
+        else:
+            yield self._rendered
+
+    def __str__(self):
+        return self.render()
+
+    def __html__(self):
+        return self.render()
+
+    def __repr__(self):
+        return repr(self.render())
+
+    def __bool__(self):
+        return bool(self.render())
+
+    def __len__(self):
+        return len(self.render())
+
+    def __iter__(self):
+        return iter(self.render())
+
+    def __contains__(self, item):
+        return item in self.render()
+
+    def __getitem__(self, key):
+        return self.render()[key]
+
+    def __lt__(self, other):
+        return self.render() < other
+
+    def __le__(self, other):
+        return self.render() <= other
+
+    def __gt__(self, other):
+        return self.render() > other
+
+    def __ge__(self, other):
+        return self.render() >= other
+
+    def __mod__(self, other):
+        return self.render() % other
+
+    def __mul__(self, other):
+        return self.render() * other
+
+    def __rmul__(self, other):
+        return other * self.render()
+
+    def __format__(self, format_spec):
+        return format(self.render(), format_spec)
+
+    def __eq__(self, other):
+        return self.render() == other
+
+    def __hash__(self):
+        return hash(self.render())
+
+    def __add__(self, other):
+        return self.render() + other
+
+    def __radd__(self, other):
+        return other + self.render()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.render(), name)
+
+
+class RenderedComponent(SafeString):
+    """
+    Output of a component rendered outside templates (see ``ComponentNode.render_to_string``)
+
+    Attributes
+    ----------
+    media: Media
+        media of the rendered components, e.g. to add it to the page (``{{ component.media }}``)
+    """
+
+    def __new__(cls, output: str, media: Media):
+        rendered = super().__new__(cls, output)
+        rendered.media = media
+        return rendered
@@ -1,7 +1,11 @@
+import sys
+from typing import Optional
+
 from django.template.library import Library as BaseLibrary
 
 from .wrappers import component_wrapper
 from .nodes import BaseComponent
+from .registry import registry
 
 __all__ = ['Library']
 
@@ -46,14 +50,30 @@ class Library(BaseLibrary):
     using Pycharm is with `register.tag('name', ComponentClass)`
     - Does not interfere with the current Django Library behavior, but it decorates the callable function
     with the component wrapper if this is a component tag.
+    - Component tags are also added to the component registry (``registry.registry``), the library name is the
+      module creating it unless it is given.
     """
 
+    def __init__(self, name: Optional[str] = None):
+        super().__init__()
+        self.name = name or sys._getframe(1).f_globals.get('__name__')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+    def register_component(self, name, component):
+        """
+        Wrap the component class as the compile function of the "name" tag
+        """
+        name, func = component_wrapper(name, component)
+        self.tags[name] = func
+        registry.register(self, name, component, func)
+        return func
+
     def tag_function(self, func):
         if isinstance(func, BaseComponent):
             name = getattr(func, "_decorated_function", func).__name__.lower()
-            name, func = component_wrapper(name, func)
-            self.tags[name] = func
-            return func
+            return self.register_component(name, func)
         return super().tag_function(func)
 
     def tag(self, name=None, compile_function=None):
@@ -64,10 +84,7 @@ class Library(BaseLibrary):
             # @register.tag
             if callable(name):
                 if isinstance(name, BaseComponent):
-                    component_name = name.__name__.lower()
-                    name, func = component_wrapper(component_name, name)
-                    self.tags[name] = func
-                    return func
+                    return self.register_component(name.__name__.lower(), name)
                 return super().tag_function(name)
             # @register.tag('foobar') or @register.tag(name='foobar')
             else:
@@ -75,16 +92,14 @@ class Library(BaseLibrary):
 
                 def dec(f):
                     if isinstance(f, BaseComponent):
-                        return tag_func(*component_wrapper(name, f))
+                        return self.register_component(name, f)
                     return tag_func(name, f)
 
                 return dec
         # register.tag('foobar', foobar)
         elif name is not None and compile_function is not None:
             if isinstance(compile_function, BaseComponent):
-                name, func = component_wrapper(name, compile_function)
-                self.tags[name] = func
-                return func
+                return self.register_component(name, compile_function)
             self.tags[name] = compile_function
             return compile_function
         else:
@@ -0,0 +1,87 @@
+from typing import Tuple
+from weakref import WeakKeyDictionary, WeakSet
+
+from django.dispatch import receiver
+from django.template import Engine
+from django.template.base import Template
+from django.utils.autoreload import file_changed
+
+__all__ = ['TemplateCache', 'reset_template_caches']
+
+_caches = WeakSet()
+
+
+class TemplateCache:
+    """
+    Resolved templates of a component class, per template engine.
+
+    Templates loaded by the cached template loader are only used while they are still cached by the loader
+    (e.g. until ``Loader.reset()`` is called), every other template is kept until the autoreloader detects a
+    file change or ``reset_template_caches()`` is called.
+    """
+
+    def __init__(self):
+        self._engines = WeakKeyDictionary()
+        _caches.add(self)
+
+    def __len__(self):
+        return sum(len(templates) for templates in self._engines.values())
+
+    def get_template(self, engine: Engine, template_name: str) -> Template:
+        """
+        Same as ``engine.get_template(template_name)``
+        """
+        return self._get(engine, (template_name,), select=False)
+
+    def select_template(self, engine: Engine, template_names: Tuple[str, ...]) -> Template:
+        """
+        Same as ``engine.select_template(template_names)``
+        """
+        return self._get(engine, tuple(template_names), select=True)
+
+    def clear(self):
+        self._engines.clear()
+
+    def _get(self, engine: Engine, template_names: Tuple[str, ...], select: bool) -> Template:
+        try:
+            templates = self._engines[engine]
+        except KeyError:
+            templates = self._engines[engine] = {}
+
+        key = (select, template_names)
+        template = templates.get(key)
+
+        if template is None or not self._is_loaded(engine, template):
+            if select:
+                template = engine.select_template(template_names)
+            else:
+                template = engine.get_template(template_names[0])
+            templates[key] = template
+
+        return template
+
+    @staticmethod
+    def _is_loaded(engine: Engine, template: Template) -> bool:
+        """
+        Check if the template is still cached by the cached template loader (if it is used)
+        """
+        for loader in engine.template_loaders:
+            loaded = getattr(loader, 'get_template_cache', None)
+            if loaded is not None:
+                origin = getattr(template, 'origin', None)
+                return loaded.get(getattr(origin, 'template_name', None)) is template
+        return True
+
+
+def reset_template_caches():
+    """
+    Discard the templates resolved by every component class
+    """
+    for cache in list(_caches):
+        cache.clear()
+
+
+@receiver(file_changed)
+def _reset_template_caches(sender, file_path, **kwargs):
+    # Do not return a value, otherwise the autoreloader skips reloading the server
+    reset_template_caches()
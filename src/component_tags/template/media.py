@@ -1,7 +1,12 @@
+import time
+from contextlib import contextmanager
+
 from django import template
 from django.forms.widgets import Media
 from django.template import Context
 
+from .observers import get_observer
+
 """
 Copyright (c) 2015 Jérôme Bon
 
@@ -37,15 +42,105 @@ def media_tag(media_type):
     return media
 
 
-def ensure_media_context(root_context: dict):
-    if MEDIA_CONTEXT_KEY not in root_context:
-        root_context[MEDIA_CONTEXT_KEY] = Media()
-
-
-def add_media(context: Context, media):
-    root_context = context.dicts[0]
-    ensure_media_context(root_context)
-    root_context[MEDIA_CONTEXT_KEY] += media
+class MediaCollector:
+    """
+    Media of the components rendered inside a template.
+
+    Every component class adds its media only once, and all of them are merged a single time, when
+    ``{% components_css %}`` or ``{% components_js %}`` are rendered.
+
+    Attributes
+    ----------
+    added: int
+        number of media additions (one per component render)
+    merges: int
+        number of times the collected media was merged
+    """
+
+    def __init__(self):
+        self._media = {}
+        self._merged = None
+        self._recordings = []
+        self.added = 0
+        self.merges = 0
+
+    def __len__(self):
+        return len(self._media)
+
+    def __contains__(self, key):
+        return key in self._media
+
+    def add(self, key, media: Media):
+        """
+        Add the media identified by key (usually the component class), duplicated keys are ignored
+        """
+        self.added += 1
+        for recorded in self._recordings:
+            recorded.append((key, media))
+        if key not in self._media:
+            self._media[key] = media
+            self._merged = None
+
+    @contextmanager
+    def record(self):
+        """
+        Record every media added (including duplicated keys) inside the block, e.g. to replay it later::
+
+            with collector.record() as recorded:
+                ...
+            # recorded = [(key, media), ...]
+        """
+        recorded = []
+        self._recordings.append(recorded)
+        try:
+            yield recorded
+        finally:
+            self._recordings.remove(recorded)
+
+    @property
+    def media(self) -> Media:
+        """
+        All the collected media merged (cached until something else is added)
+        """
+        if self._merged is None:
+            observer = get_observer()
+            start = time.perf_counter() if observer is not None else 0
+
+            merged = Media()
+            for media in self._media.values():
+                merged = merged + media
+            self._merged = merged
+            self.merges += 1
+
+            if observer is not None:
+                observer.media_merge(len(self._media), time.perf_counter() - start)
+        return self._merged
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'added': self.added,
+            'unique': len(self._media),
+            'duplicates': self.added - len(self._media),
+            'merges': self.merges,
+        }
+
+
+def get_media_collector(context: Context) -> MediaCollector:
+    """
+    Get the media collector of the current template rendering, it is stored inside the root render context
+    so it is shared with every component, even the ones rendered inside isolated contexts.
+    """
+    root_context = context.render_context.dicts[0]
+    try:
+        return root_context[MEDIA_CONTEXT_KEY]
+    except KeyError:
+        collector = root_context[MEDIA_CONTEXT_KEY] = MediaCollector()
+        return collector
+
+
+def add_media(context: Context, media: Media, key=None):
+    get_media_collector(context).add(media if key is None else key, media)
 
 
 class MediaNode(template.Node):
@@ -58,11 +153,14 @@ class MediaNode(template.Node):
         return self.render_media(context) + rendered
 
     def render_media(self, context):
-        tags = []
-        if MEDIA_CONTEXT_KEY in context:
-            media = context[MEDIA_CONTEXT_KEY]
-            if self.media_type == "css":
-                tags = media.render_css()
-            elif self.media_type == "js":
-                tags = media.render_js()
-        return "".join(tags)
+        collector = get_media_collector(context)
+        if collector:
+            return "".join(self.get_tags(collector.media))
+        return ""
+
+    def get_tags(self, media: Media) -> list:
+        if self.media_type == "css":
+            return list(media.render_css())
+        elif self.media_type == "js":
+            return list(media.render_js())
+        return []
@@ -0,0 +1,258 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .observers import RenderObserver
+
+__all__ = ['ComponentMetrics', 'MetricsExporter', 'MetricsRecorder', 'PrometheusExporter', 'get_exporter']
+
+logger = logging.getLogger('component_tags.metrics')
+
+# Upper bounds (seconds) of the render latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class ComponentMetrics:
+    """
+    Metrics of a component class.
+
+    Attributes
+    ----------
+    renders: int
+        number of renders
+    seconds: float
+        total render time (including the components rendered inside it)
+    buckets: list
+        number of renders per latency bucket (see ``BUCKETS``), the last one counts the renders above all bounds
+    cache: dict
+        number of cache lookups by (cache name, hit)
+    slow_renders: int
+        number of renders slower than the component threshold
+    """
+
+    __slots__ = ('renders', 'seconds', 'buckets', 'cache', 'slow_renders')
+
+    def __init__(self):
+        self.renders = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.cache = {}
+        self.slow_renders = 0
+
+    def add_render(self, seconds: float, slow: bool = False):
+        self.renders += 1
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        if slow:
+            self.slow_renders += 1
+
+    def add_cache(self, key: Tuple[str, bool], count: int = 1):
+        self.cache[key] = self.cache.get(key, 0) + count
+
+    def merge(self, other: 'ComponentMetrics'):
+        self.renders += other.renders
+        self.seconds += other.seconds
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        for key, count in other.cache.items():
+            self.add_cache(key, count)
+        self.slow_renders += other.slow_renders
+
+    def to_dict(self) -> dict:
+        return {
+            'renders': self.renders,
+            'seconds': self.seconds,
+            'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], self.buckets)),
+            'cache': {f'{name}.{"hit" if hit else "miss"}': count for (name, hit), count in self.cache.items()},
+            'slow_renders': self.slow_renders,
+        }
+
+
+class MetricsRecorder(RenderObserver):
+    """
+    Records the metrics of the components rendered while it is active (usually a sampled request), they are
+    handed to the exporter once, when ``flush()`` is called.
+
+    Renders slower than the component ``Meta.slow_render_ms`` (or ``settings.COMPONENT_TAGS_SLOW_RENDER_MS``)
+    are logged by the "component_tags.metrics" logger.
+    """
+
+    def __init__(self, exporter: Optional['MetricsExporter'] = None):
+        self.exporter = exporter
+        self.slow_render_ms = getattr(settings, 'COMPONENT_TAGS_SLOW_RENDER_MS', None)
+        self.components: Dict[type, ComponentMetrics] = {}
+        self.media_merges = 0
+        self.media_seconds = 0.0
+
+    def get_metrics(self, node) -> ComponentMetrics:
+        try:
+            return self.components[type(node)]
+        except KeyError:
+            metrics = self.components[type(node)] = ComponentMetrics()
+            return metrics
+
+    def observe(self, node, context, render):
+        start = time.perf_counter()
+        try:
+            return super().observe(node, context, render)
+        finally:
+            seconds = time.perf_counter() - start
+            threshold = getattr(node.meta, 'slow_render_ms', None)
+            if threshold is None:
+                threshold = self.slow_render_ms
+
+            slow = threshold is not None and seconds * 1000 > threshold
+            if slow:
+                logger.warning('Slow render of [%s] component: %.3fms (threshold %sms)', node.tag_name,
+                               seconds * 1000, threshold, extra={'component': node.tag_name, 'seconds': seconds})
+
+            self.get_metrics(node).add_render(seconds, slow)
+
+    def cache(self, node, name: str, hit: bool):
+        self.get_metrics(node).add_cache((name, hit))
+        super().cache(node, name, hit)
+
+    def media_merge(self, count: int, seconds: float):
+        self.media_merges += 1
+        self.media_seconds += seconds
+        super().media_merge(count, seconds)
+
+    def flush(self):
+        """
+        Hand the recorded metrics to the exporter (the default one if it is not defined)
+        """
+        exporter = self.exporter or get_exporter()
+        exporter.export(self)
+        self.components = {}
+        self.media_merges = 0
+        self.media_seconds = 0.0
+
+
+class MetricsExporter:
+    """
+    Receives the metrics recorded by every sampled request, subclass it to send them to a metrics backend
+    (``settings.COMPONENT_TAGS_METRICS_EXPORTER``).
+    """
+
+    def export(self, recorder: MetricsRecorder):
+        raise NotImplementedError('subclasses of MetricsExporter must provide an export() method')
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    Aggregates the metrics per component class in memory (per process), they can be rendered with the Prometheus
+    text exposition format (see ``component_tags.middleware.metrics``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.components: Dict[str, ComponentMetrics] = {}
+            self.requests = 0
+            self.media_merges = 0
+            self.media_seconds = 0.0
+
+    def export(self, recorder: MetricsRecorder):
+        with self._lock:
+            self.requests += 1
+            self.media_merges += recorder.media_merges
+            self.media_seconds += recorder.media_seconds
+            for component, metrics in recorder.components.items():
+                name = f'{component.__module__}.{component.__qualname__}'
+                try:
+                    self.components[name].merge(metrics)
+                except KeyError:
+                    self.components[name] = aggregated = ComponentMetrics()
+                    aggregated.merge(metrics)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'media_merges': self.media_merges,
+                'media_seconds': self.media_seconds,
+                'components': {name: metrics.to_dict() for name, metrics in self.components.items()},
+            }
+
+    def render(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP component_tags_sampled_requests_total Sampled requests.',
+            '# TYPE component_tags_sampled_requests_total counter',
+            f'component_tags_sampled_requests_total {snapshot["requests"]}',
+            '# HELP component_tags_render_seconds Component render time, including the components rendered inside.',
+            '# TYPE component_tags_render_seconds histogram',
+        ]
+
+        for name, metrics in snapshot['components'].items():
+            label = f'component="{escape_label(name)}"'
+            total = 0
+            for bound, count in metrics['buckets'].items():
+                total += count
+                lines.append(f'component_tags_render_seconds_bucket{{{label},le="{bound}"}} {total}')
+            lines.append(f'component_tags_render_seconds_sum{{{label}}} {metrics["seconds"]!r}')
+            lines.append(f'component_tags_render_seconds_count{{{label}}} {metrics["renders"]}')
+
+        lines += [
+            '# HELP component_tags_cache_lookups_total Component output cache lookups.',
+            '# TYPE component_tags_cache_lookups_total counter',
+        ]
+        for name, metrics in snapshot['components'].items():
+            for key, count in metrics['cache'].items():
+                cache, result = key.split('.')
+                lines.append(f'component_tags_cache_lookups_total{{component="{escape_label(name)}",'
+                             f'cache="{cache}",result="{result}"}} {count}')
+
+        lines += [
+            '# HELP component_tags_slow_renders_total Component renders slower than their threshold.',
+            '# TYPE component_tags_slow_renders_total counter',
+        ]
+        for name, metrics in snapshot['components'].items():
+            lines.append(f'component_tags_slow_renders_total{{component="{escape_label(name)}"}} '
+                         f'{metrics["slow_renders"]}')
+
+        lines += [
+            '# HELP component_tags_media_merge_seconds Time spent merging the media of the rendered components.',
+            '# TYPE component_tags_media_merge_seconds summary',
+            f'component_tags_media_merge_seconds_sum {snapshot["media_seconds"]!r}',
+            f'component_tags_media_merge_seconds_count {snapshot["media_merges"]}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_exporter = None
+
+
+def get_exporter() -> MetricsExporter:
+    """
+    Exporter declared by ``settings.COMPONENT_TAGS_METRICS_EXPORTER`` (dotted path of the class), the in-memory
+    ``PrometheusExporter`` by default. It is created once per process.
+    """
+    global _exporter
+    if _exporter is None:
+        path = getattr(settings, 'COMPONENT_TAGS_METRICS_EXPORTER', None)
+        _exporter = import_string(path)() if path else PrometheusExporter()
+    return _exporter
+
+
+@receiver(setting_changed)
+def _reset_exporter(setting, **kwargs):
+    global _exporter
+    if setting == 'COMPONENT_TAGS_METRICS_EXPORTER':
+        _exporter = None
@@ -1,12 +1,26 @@
-from inspect import getmembers
-from copy import copy
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Iterable, Iterator, Optional
 
 from django.forms.widgets import Media
-from django.template.base import Node, NodeList
-
-from .media import add_media
-from .attributes import Attribute
+from django.template import Context, Engine
+from django.template.base import FilterExpression, Node, NodeList, Template, TextNode
+from django.template.context import make_context
+from django.utils.html import conditional_escape
+from django.utils.safestring import SafeString
+
+from .analysis import get_references, is_referenced, is_stateful, register_node
+from .asynchronous import NOT_LOADED, load_context_data
+from .cache import FragmentCache, exclude_render, get_render_memo, pure_cache
+from .loading import TemplateCache
+from .media import add_media, get_media_collector
+from .observers import get_observer, notify_cache
+from .attributes import Attribute, BoundAttribute
 from .context import ComponentContext
+from .helpers import RenderedComponent
+from .parallel import ParallelNodeList, get_parallel_render
+from .plan import ComponentPlan
+from .streaming import iter_template, join_chunks
 
 
 __all__ = ['ComponentNode', 'BaseComponent', 'Meta', 'Media']
@@ -18,30 +32,77 @@ class TemplateIsNull(Exception):
 
 class Meta(Media):
     """
-    Meta definition of component tags, currently only used to declare template information
+    Meta definition of component tags, used to declare template information and media
+
+    Attributes
+    ----------
+    template_name: Optional[str]
+        template used to render the component
+    cache: Optional[FragmentCache]
+        cache options of the rendered output, declared as a dict (e.g. ``cache = {'timeout': 300}``),
+        see ``FragmentCache``
+    pure: bool
+        the rendered output only depends on the component attributes, options, nodelist and slots, therefore it
+        is memoized inside the current process, see ``PureCache`` (``cache`` is not used)
+    dedupe: bool
+        reuse the output of the component rendered with identical inputs during the same template rendering,
+        see ``RenderMemo`` (enabled by default)
+    parallel: bool
+        render the components inside the nodelist with a thread pool (e.g. widgets doing blocking I/O), see
+        ``ParallelNodeList``
+    slow_render_ms: Optional[float]
+        renders slower than this threshold are logged while metrics are recorded, see ``MetricsRecorder``
+        (``settings.COMPONENT_TAGS_SLOW_RENDER_MS`` by default)
     """
+
+    # Options inherited from the superclass meta, unless they are defined
+    inherited = ('template_name', 'cache', 'pure', 'dedupe', 'parallel', 'slow_render_ms')
+
     def __init__(self, meta=None, css=None, js=None):
         super().__init__(meta, css, js)
         self.template_name = getattr(meta, 'template_name', None)
+        self.cache = FragmentCache.from_options(getattr(meta, 'cache', None))
+        self.pure = getattr(meta, 'pure', False)
+        self.dedupe = getattr(meta, 'dedupe', True)
+        self.parallel = getattr(meta, 'parallel', False)
+        self.slow_render_ms = getattr(meta, 'slow_render_ms', None)
 
 
-def meta_property(cls):
+class meta_property:
     """
-    Get the media property of the superclass, if it exists
+    Get the media property of the superclass, if it exists, merged with the current class definition.
+
+    The merge is computed once per class, on first access, and shared by every node instance;
+    use ``BaseComponent.reset_meta`` to discard it (e.g. after changing the ``Meta`` definition in tests).
     """
-    def _meta(self):
 
-        sup_cls = super(cls, self)
+    def __init__(self, cls):
+        self.cls = cls
+
+    def __get__(self, instance, owner=None):
+        meta = self.cls.__dict__.get('_meta_cache')
+        if meta is None:
+            meta = self.merge(owner if instance is None else instance)
+            self.cls._meta_cache = meta
+        return meta
+
+    def merge(self, obj):
+        cls = self.cls
+        sup_cls = super(cls, obj)
         try:
             # noinspection PyUnresolvedReferences
             base = sup_cls.meta
         except AttributeError:
+            base = None
+
+        if not isinstance(base, Media):
             base = Meta()
 
         # Get the media definition for this class
         definition = getattr(cls, 'Meta', None)
 
         if definition:
+            meta = Meta(definition)
             extend = getattr(definition, 'extend', True)
             if extend:
                 if extend is True:
@@ -50,16 +111,36 @@ def meta_property(cls):
                     m = Meta()
                     for medium in extend:
                         m = m + base[medium]
-                extended = m + Meta(definition)
+                extended = m + meta
             else:
-                extended = Meta(definition)
+                extended = meta
 
-            template_name = getattr(definition, 'template_name', None)
-            if template_name:
-                setattr(extended, 'template_name', template_name)
+            for name in Meta.inherited:
+                if hasattr(definition, name):
+                    setattr(extended, name, getattr(meta, name))
+                else:
+                    setattr(extended, name, getattr(base, name, None))
             return extended
         return base
-    return property(_meta)
+
+
+def get_declared_attributes(cls):
+    """
+    Collect the attributes declared inside the class and its superclasses, keeping the declaration order.
+
+    Attributes are resolved the same way python resolves class attributes, so a subclass can override an
+    inherited attribute or remove it by assigning any other value (e.g. ``None``) with the same name.
+    """
+    attributes = {}
+
+    for base in reversed(cls.__mro__):
+        for name, value in base.__dict__.items():
+            if isinstance(value, Attribute):
+                attributes[name] = BoundAttribute(name, value.context_name or name, value)
+            elif name in attributes:
+                del attributes[name]
+
+    return MappingProxyType(attributes)
 
 
 class BaseComponent(type):
@@ -71,15 +152,39 @@ class BaseComponent(type):
         if 'meta' not in attrs:
             new_class.meta = meta_property(new_class)
 
+        # Immutable attribute table, shared by every node instance (read-only while rendering)
+        new_class.declared_attributes = get_declared_attributes(new_class)
+
+        # Merged meta, computed on first access (see meta_property)
+        new_class._meta_cache = None
+
+        # Resolved templates, per engine
+        new_class._template_cache = TemplateCache()
+
         return new_class
 
+    def reset_meta(cls):
+        """
+        Discard the merged meta of the component class and all its subclasses, it will be computed again
+        on the next access.
+        """
+        classes = [cls]
+        while classes:
+            klass = classes.pop()
+            klass._meta_cache = None
+            classes.extend(klass.__subclasses__())
+
 
+@register_node
 class ComponentNode(Node, metaclass=BaseComponent):
     """
     Components are used to mark up the start of an HTML element
     and they are usually enclosed in angle brackets.
     """
 
+    # Django nodes have a __dict__ (e.g. "token" and "origin"), only the component values are slots
+    __slots__ = ('tag_name', 'nodelist', 'attrs', 'slots', 'options', 'isolated_context', 'plan', 'stateful')
+
     TemplateIsNull = TemplateIsNull
 
     def __init__(self, tag_name: str, nodelist: NodeList, options: dict, slots: dict, *args,
@@ -90,6 +195,8 @@ class ComponentNode(Node, metaclass=BaseComponent):
         self.slots = slots
         self.options = options
         self.isolated_context = isolated_context
+        self.plan = ComponentPlan(type(self), kwargs, options)
+        self.stateful = is_stateful(nodelist, *slots.values())
 
     def get_template_name(self):
         return getattr(self.meta, 'template_name', None)
@@ -100,74 +207,378 @@ class ComponentNode(Node, metaclass=BaseComponent):
         if not template_name:
             raise self.TemplateIsNull(f'[{self.tag_name.title()}] component does not have a template assigned.')
 
-        return context.template.engine.get_template(template_name)
+        return self._template_cache.get_template(self.get_engine(context), template_name)
+
+    def get_engine(self, context) -> Engine:
+        """
+        Engine of the template being rendered, the default engine when the context is not bound to a template
+        (e.g. ``render_many``)
+        """
+        template = getattr(context, 'template', None)
+        return Engine.get_default() if template is None else template.engine
 
     def get_context_data(self, context):
         return ComponentContext(self.nodelist, initial=context, isolated=self.isolated_context)
 
+    async def aget_context_data(self, values: dict) -> dict:
+        """
+        Extra values of the component context loaded asynchronously (e.g. fetched from a service), override it
+        and render the template with ``asynchronous.arender`` so the data of every component is loaded
+        concurrently. "values" are the parent context values and the component attributes and options.
+        """
+        return {}
+
+    @property
+    def is_async(self) -> bool:
+        return type(self).aget_context_data is not ComponentNode.aget_context_data
+
+    def get_async_data(self, context, values: list):
+        """
+        Values loaded by ``aget_context_data`` (``NOT_LOADED`` if they are loaded by the next ``arender`` pass)
+        """
+        data = context.flatten()
+        for kind, key, value in self.plan.inputs(values):
+            if kind != ComponentPlan.CLASS:
+                data[key] = value
+        return load_context_data(self, context, data)
+
+    @property
+    def dedupe(self) -> bool:
+        """
+        Whether the output can be reused by identical renders of the component (``Meta.dedupe``), only isolated
+        components using the default context data, without stateful nodes, are only a function of their inputs
+        (``aget_context_data`` receives the parent context values).
+        """
+        return (
+            self.isolated_context
+            and not self.stateful
+            and not self.is_async
+            and getattr(self.meta, 'dedupe', True)
+            and type(self).get_context_data is ComponentNode.get_context_data
+        )
+
     def render(self, context):
-        add_media(context, self.meta)
+        observer = get_observer()
+        if observer is None:
+            return self.render_node(context)
+        return observer.observe(self, context, self.render_node)
+
+    def render_node(self, context):
+        # Class attributes, attribute and option variables (compiled at parse time), resolved using the parent
+        # context before the component context replaces its values
+        values = [binding.resolve(context) for binding in self.plan.dynamic_bindings]
+        return self.render_values(context, values)
+
+    def render_values(self, context, values: list):
+        add_media(context, self.meta, type(self))
+
+        if not self.dedupe:
+            exclude_render(context)
+            return self.render_component(context, values)
+
+        # Reuse the output of an identical render inside the same template rendering
+        memo = get_render_memo(context)
+        collector = get_media_collector(context)
+        template = self.resolve_template(context)
+        key = memo.make_key(self, template, self.plan.inputs(values))
+
+        cached = memo.get(key)
+        notify_cache(self, 'dedupe', cached is not None)
+        if cached is not None:
+            output, media = cached
+            for name, value in media:
+                collector.add(name, value)
+            return output
+
+        excluded = memo.excluded
+        with collector.record() as recorded:
+            output = self.render_component(context, values, template)
+
+        # Components rendered inside the template that cannot be reused make the output not reusable either
+        if memo.excluded == excluded:
+            memo.set(key, output, tuple(recorded), values)
+        return output
+
+    def resolve_template(self, context):
+        """
+        Template used to render the component, ``get_template`` may return a template, a template name or a list
+        of template names
+        """
         template = self.get_template(context)
 
         # Does this quack like a Template?
         if not callable(getattr(template, 'render', None)):
-            # If not, try the cache and select_template().
+            # If not, use select_template() (cached per engine).
             template_name = template or ()
             if isinstance(template_name, str):
                 template_name = (template_name,)
             else:
                 template_name = tuple(template_name)
-            cache = context.render_context.dicts[0].setdefault(self, {})
-            template = cache.get(template_name)
-
-            if template is None:
-                template = context.template.engine.select_template(template_name)
-                cache[template_name] = template
+            template = self._template_cache.select_template(self.get_engine(context), template_name)
 
         # Use the base.Template of a backends.django.Template.
         elif hasattr(template, 'template'):
             template = template.template
 
-        attrs = self.attrs.copy()
+        return template
 
-        # Do not use original context since we are updating values inside this function
-        _context = self.get_context_data(copy(context))
+    def make_context(self, _context: ComponentContext, values: list, references, data: Optional[dict] = None):
+        """
+        Add the attributes, options, data (see ``aget_context_data``) and slots of the component to its context,
+        returns the template context
+        """
+        _context.references = references
 
-        # Class attributes
-        class_attrs = getmembers(self, lambda a: isinstance(a, Attribute))
+        # Literal classes and attributes (already formatted at parse time)
+        if self.plan.static_attributes:
+            _context.add_static_attributes(self.plan.static_attributes, self.plan.attributes)
 
-        while class_attrs:
-            key, attr = class_attrs.pop()
-
-            if not attr.context_name:
-                attr.set_context_name(key)
-
-            try:
-                value = attr.resolve(attrs.pop(key), context)
-            except KeyError:
-                value = attr.default
-
-            key = attr.context_name
-
-            if attr.as_context:
-                _context[key] = value
-            elif attr.as_class:
+        for binding, value in zip(self.plan.dynamic_bindings, values):
+            if binding.kind == ComponentPlan.CONTEXT:
+                _context[binding.key] = value
+            elif binding.kind == ComponentPlan.CLASS:
                 _context.add_class(value)
             else:
-                _context.add_attribute(key, value)
+                _context.add_attribute(binding.key, value)
 
-        # Attribute variables
-        for name, value in attrs.items():
-            _context.add_attribute(name, value)
+        if data:
+            _context.clean().dicts[-1].update(data)
 
-        # Option variables
-        for name, value in self.options.items():
-            _context[name] = value.resolve(context)
+        if getattr(self.meta, 'parallel', False):
+            _context._nodelist = ParallelNodeList(self.nodelist)
 
         context = _context.make()  # Slots should only have access to parent context
 
         # Slot nodes
         for name, value in self.slots.items():
-            _context[name] = value.render(context)
-
-        return template.render(context)
+            if is_referenced(name, references):
+                _context[name] = _context.render_lazy(value)
+
+        return context
+
+    def render_component(self, context, values: list, template=None):
+        if template is None:
+            template = self.resolve_template(context)
+
+        # Context variables used by the template, unused child nodes are not rendered
+        references = get_references(template)
+
+        data = self.get_async_data(context, values) if self.is_async else None
+        if data is NOT_LOADED:
+            return ''
+
+        # Cached output (Meta.cache), it also depends on the parent context variables listed in "vary_on"
+        pure = getattr(self.meta, 'pure', False)
+        fragment_cache = None if pure else getattr(self.meta, 'cache', None)
+        if fragment_cache is not None:
+            vary = fragment_cache.resolve_vary(context)
+        # The component context restores the parent context values once the component is rendered
+        with self.get_context_data(context) as _context:
+            context = self.make_context(_context, values, references, data)
+
+            if pure:
+                return pure_cache.render(self, template, context, self.plan.inputs(values))
+
+            if fragment_cache is not None:
+                return fragment_cache.render(self, template, context, self.plan.inputs(values), vary)
+
+            return template.render(context)
+
+    def stream(self, context) -> Iterator[str]:
+        """
+        Same as ``render``, yielding the output in chunks as the component template and its child components are
+        rendered (see ``streaming.stream``). Cached components and observed renders are yielded at once.
+        """
+        # Child component of a parallel nodelist (see ParallelNodeList)
+        parallel = get_parallel_render(context)
+        if parallel is not None and parallel.dicts is context.dicts:
+            yield parallel.submit(self, context)
+            return
+
+        meta = self.meta
+        if get_observer() is not None or getattr(meta, 'pure', False) or getattr(meta, 'cache', None) is not None:
+            yield self.render(context)
+            return
+
+        add_media(context, meta, type(self))
+        values = [binding.resolve(context) for binding in self.plan.dynamic_bindings]
+
+        if not self.dedupe:
+            exclude_render(context)
+            yield from self.stream_component(context, values)
+            return
+
+        memo = get_render_memo(context)
+        collector = get_media_collector(context)
+        template = self.resolve_template(context)
+        key = memo.make_key(self, template, self.plan.inputs(values))
+
+        cached = memo.get(key)
+        if cached is not None:
+            output, media = cached
+            for name, value in media:
+                collector.add(name, value)
+            yield output
+            return
+
+        chunks = []
+        excluded = memo.excluded
+        with collector.record() as recorded:
+            for chunk in self.stream_component(context, values, template):
+                chunks.append(chunk)
+                yield chunk
+
+        if memo.excluded == excluded:
+            memo.set(key, SafeString(''.join(chunks)), tuple(recorded), values)
+
+    def stream_component(self, context, values: list, template=None) -> Iterator[str]:
+        if template is None:
+            template = self.resolve_template(context)
+        references = get_references(template)
+
+        data = self.get_async_data(context, values) if self.is_async else None
+        if data is NOT_LOADED:
+            return
+
+        with self.get_context_data(context) as _context:
+            context = self.make_context(_context, values, references, data)
+
+            if isinstance(template, Template):
+                yield from iter_template(template, context)
+            else:
+                yield template.render(context)
+
+    def iter_each(self, context, items: Iterable, item_name: str) -> Iterator[str]:
+        """
+        Render the component once per item, yielding the output of every item. The item is stored as "item_name"
+        inside the parent context while it is rendered (e.g. used by the attribute and option expressions).
+
+        The media, the template and its references are resolved once, only the attribute and option values and
+        the component context are computed per item (identical items are not deduplicated). Cached and async
+        components, and observed renders, are rendered item by item as usual.
+        """
+        meta = self.meta
+        batched = not (
+            get_observer() is not None
+            or self.is_async
+            or getattr(meta, 'pure', False)
+            or getattr(meta, 'cache', None) is not None
+        )
+
+        with context.push():
+            if not batched:
+                for item in items:
+                    context[item_name] = item
+                    yield self.render(context)
+                return
+
+            template = references = None
+            bindings = self.plan.dynamic_bindings
+            for item in items:
+                context[item_name] = item
+                if template is None:
+                    add_media(context, meta, type(self))
+                    template = self.resolve_template(context)
+                    references = get_references(template)
+
+                values = [binding.resolve(context) for binding in bindings]
+                with self.get_context_data(context) as _context:
+                    output = template.render(self.make_context(_context, values, references))
+                yield output
+
+    @classmethod
+    def iter_many(cls, items: Iterable, context=None, request=None, item_name: str = 'item',
+                  options: Optional[dict] = None, chunk_size: Optional[int] = None, **attrs) -> Iterator[str]:
+        """
+        Render the component once per item from python code (see ``iter_each``), yielding the output of every
+        item, or chunks of at least "chunk_size" characters. "attrs" are the component and html attributes and
+        "options" the extra context values (same as the "with" options), every value is used as is; the item is
+        added to the component context as "item_name".
+
+        Examples
+        --------
+
+            .. code-block:: python
+
+                return StreamingHttpResponse(Row.iter_many(rows, request=request, chunk_size=4096))
+        """
+        options = dict(options or {}, **{item_name: FilterExpression(item_name, None)})
+        node = cls(cls.__name__.lower(), NodeList(), options, {}, **attrs)
+
+        if not isinstance(context, Context):
+            context = make_context(context, request)
+
+        chunks = node._iter_bound(context, items, item_name)
+        return chunks if chunk_size is None else join_chunks(chunks, chunk_size)
+
+    @classmethod
+    def render_many(cls, items: Iterable, context=None, request=None, item_name: str = 'item',
+                    options: Optional[dict] = None, **attrs) -> SafeString:
+        """
+        Same as ``iter_many``, returning the whole output
+        """
+        return SafeString(''.join(cls.iter_many(items, context, request, item_name, options, **attrs)))
+
+    @classmethod
+    def render_to_string(cls, context=None, request=None, nodelist: str = '', slots: Optional[dict] = None,
+                         options: Optional[dict] = None, **attrs) -> RenderedComponent:
+        """
+        Render the component from python code (e.g. a view returning a single component), without parsing a
+        template tag. "attrs" are the component and html attributes, "options" the extra context values (same as
+        the "with" options) and "slots" the output of the slots by name; every value is used as is, the nodelist
+        and slots are escaped unless they are safe strings.
+
+        The output is returned with the media of the rendered components (``RenderedComponent.media``).
+
+        Examples
+        --------
+
+            .. code-block:: python
+
+                def like(request, pk):
+                    button = Button.render_to_string(request=request, color='primary', slots={'icon': icon})
+                    return HttpResponse(button)
+        """
+        slots = {
+            f'slot_{name}': TextNode(conditional_escape(value)) for name, value in (slots or {}).items()
+        }
+        nodelist = NodeList([TextNode(conditional_escape(nodelist))] if nodelist else [])
+        node = cls(cls.__name__.lower(), nodelist, options or {}, slots, **attrs)
+
+        if not isinstance(context, Context):
+            context = make_context(context, request)
+
+        # The render memo is not used, there is only one render of the component inside this context
+        observer = get_observer()
+        with node.bind_template(context):
+            if observer is None:
+                output = node.render_single(context)
+            else:
+                output = observer.observe(node, context, node.render_single)
+        return RenderedComponent(output, get_media_collector(context).media)
+
+    def render_single(self, context):
+        """
+        Same as ``render_node``, without looking up identical renders (see ``render_values``)
+        """
+        values = [binding.resolve(context) for binding in self.plan.dynamic_bindings]
+        add_media(context, self.meta, type(self))
+        return self.render_component(context, values)
+
+    @contextmanager
+    def bind_template(self, context):
+        """
+        Bind a context without template (e.g. created by ``render_to_string``) to the component template, so
+        the context processors run once and the nested components use its engine
+        """
+        template = self.resolve_template(context) if context.template is None else None
+        if not isinstance(template, Template):
+            yield context
+            return
+
+        with context.bind_template(template):
+            yield context
+
+    def _iter_bound(self, context, items: Iterable, item_name: str) -> Iterator[str]:
+        with self.bind_template(context):
+            yield from self.iter_each(context, items, item_name)
@@ -0,0 +1,90 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+__all__ = ['RenderObserver', 'get_observer', 'notify_cache', 'observing']
+
+_state = threading.local()
+
+# Number of active observers (in any thread), renders only look for the observer of the current thread if there is one
+_active = 0
+_lock = threading.Lock()
+
+
+class RenderObserver:
+    """
+    Observes the component renders of the current thread while it is active (see ``observing``), e.g. to time them.
+
+    Observers can be nested, the active observer receives every render first and ``super().observe()`` passes it
+    to the observer that was active before it.
+
+    Attributes
+    ----------
+    parent: Optional[RenderObserver]
+        observer that was active when this one was activated
+    """
+
+    parent = None
+
+    def observe(self, node, context, render):
+        """
+        Called instead of rendering the component node, ``render(context)`` renders it
+        """
+        if self.parent is not None:
+            return self.parent.observe(node, context, render)
+        return render(context)
+
+    def cache(self, node, name: str, hit: bool):
+        """
+        Called when the output of the component node is looked up in a cache ("dedupe", "pure" or "fragment")
+        """
+        if self.parent is not None:
+            self.parent.cache(node, name, hit)
+
+    def media_merge(self, count: int, seconds: float):
+        """
+        Called when the media of "count" components is merged (e.g. by ``{% components_css %}``)
+        """
+        if self.parent is not None:
+            self.parent.media_merge(count, seconds)
+
+
+def get_observer() -> Optional[RenderObserver]:
+    """
+    Active observer of the current thread, if any
+    """
+    if not _active:
+        return None
+    return getattr(_state, 'observer', None)
+
+
+def notify_cache(node, name: str, hit: bool):
+    """
+    Notify the active observer (if any) of a cache lookup of the component node output
+    """
+    observer = get_observer()
+    if observer is not None:
+        observer.cache(node, name, hit)
+
+
+@contextmanager
+def observing(observer: RenderObserver):
+    """
+    Activate the observer for the component renders of the current thread inside the block::
+
+        with observing(RenderProfiler()) as profiler:
+            template.render(context)
+    """
+    global _active
+
+    observer.parent = getattr(_state, 'observer', None)
+    _state.observer = observer
+    with _lock:
+        _active += 1
+    try:
+        yield observer
+    finally:
+        with _lock:
+            _active -= 1
+        _state.observer = observer.parent
+        observer.parent = None
@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+from django.template.base import Node, NodeList
+from django.utils import timezone, translation
+from django.utils.safestring import SafeString
+
+from .cache import RENDER_MEMO_CONTEXT_KEY
+from .media import MEDIA_CONTEXT_KEY, MediaCollector, get_media_collector
+from .observers import get_observer
+from .streaming import iter_node
+
+__all__ = ['ParallelNodeList', 'get_executor']
+
+PARALLEL_CONTEXT_KEY = '__component_tags__parallel'
+
+_state = threading.local()
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool shared by every parallel rendering, ``settings.COMPONENT_TAGS_PARALLEL_WORKERS`` threads (4 by
+    default)
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = getattr(settings, 'COMPONENT_TAGS_PARALLEL_WORKERS', 4)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='component_tags')
+    return _executor
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == 'COMPONENT_TAGS_PARALLEL_WORKERS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+class ParallelRender:
+    """
+    Components rendered by the thread pool while a ``ParallelNodeList`` is rendered, only the components found at
+    the nodelist level (including inside ``{% for %}``, ``{% if %}``, ...) are submitted.
+
+    Attributes
+    ----------
+    dicts: list
+        context values of the nodelist level (other levels, e.g. lazy renders, are rendered as usual)
+    """
+
+    __slots__ = ('dicts',)
+
+    def __init__(self, dicts: list):
+        self.dicts = dicts
+
+    def submit(self, node, context):
+        """
+        Render the component node inside the thread pool (a future of its output and media), components depending
+        on the parent context (not isolated or stateful) and observed renders are rendered at once.
+
+        The active language and timezone of the current thread are used by the worker thread.
+        """
+        if not node.isolated_context or node.stateful or get_observer() is not None:
+            return node.render(context)
+
+        # Resolved by the current thread, the component context does not depend on the parent context values
+        values = [binding.resolve(context) for binding in node.plan.dynamic_bindings]
+        return get_executor().submit(
+            render_task, node, copy_context(context), values, translation.get_language(),
+            timezone.get_current_timezone(),
+        )
+
+
+def copy_context(context):
+    """
+    Copy of the context values and render state, with its own media collector and render memo
+    """
+    context = copy(context)
+    render_context = context.render_context
+    render_context.dicts = [dict(values) for values in render_context.dicts]
+    render_context.dicts[0].pop(MEDIA_CONTEXT_KEY, None)
+    render_context.dicts[0].pop(RENDER_MEMO_CONTEXT_KEY, None)
+    render_context.dicts[0].pop(PARALLEL_CONTEXT_KEY, None)
+    return context
+
+
+def render_task(node, context, values: list, language: Optional[str], tz) -> Tuple[str, List[tuple]]:
+    # Parallel nodelists rendered by a worker are rendered sequentially, the pool could be exhausted
+    _state.worker = True
+
+    # Same as a request, database connections of the worker thread are not kept beyond CONN_MAX_AGE
+    close_old_connections()
+    try:
+        with translation.override(language), timezone.override(tz):
+            with get_media_collector(context).record() as recorded:
+                output = node.render_values(context, values)
+    finally:
+        close_old_connections()
+    return output, recorded
+
+
+def get_parallel_render(context) -> Optional[ParallelRender]:
+    return context.render_context.dicts[0].get(PARALLEL_CONTEXT_KEY)
+
+
+class ParallelNodeList(Node):
+    """
+    Nodelist of a component declaring ``Meta.parallel``, its child components are rendered by a thread pool (see
+    ``get_executor``) and the output is assembled in order. Every child component is rendered with a copy of the
+    context, the media they add is merged in the same order as a sequential rendering.
+    """
+
+    child_nodelists = ('nodelist',)
+
+    def __init__(self, nodelist: NodeList):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        root = context.render_context.dicts[0]
+        if getattr(_state, 'worker', False) or PARALLEL_CONTEXT_KEY in root:
+            return self.nodelist.render(context)
+
+        # Media added while rendering the nodelist, replayed in order with the media of the submitted components
+        collector = get_media_collector(context)
+        root[MEDIA_CONTEXT_KEY] = MediaCollector()
+        root[PARALLEL_CONTEXT_KEY] = ParallelRender(context.dicts)
+        parts = []
+        try:
+            chunks = iter_node(self.nodelist, context)
+            while True:
+                with root[MEDIA_CONTEXT_KEY].record() as recorded:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                parts.append((chunk, recorded))
+        finally:
+            root[MEDIA_CONTEXT_KEY] = collector
+            del root[PARALLEL_CONTEXT_KEY]
+
+        output = []
+        for chunk, recorded in parts:
+            if isinstance(chunk, Future):
+                chunk, media = chunk.result()
+                recorded = [*recorded, *media]
+            for key, media in recorded:
+                collector.add(key, media)
+            output.append(chunk)
+        return SafeString(''.join(output))
@@ -26,16 +26,43 @@ def parse_component(nodelist, token, parser):
     #     )
 
     tag_name = bits.pop(0)
-    args = []
-    kwargs, options, slots = {}, {}, {}
+    args, kwargs, options = parse_arguments(tag_name, bits, parser)
+    slots = {}
     isolated_context = True
 
+    slot_nodes = list(filter(lambda x: isinstance(x[1], Slot), enumerate(nodelist)))
+
+    while slot_nodes:
+        pos, node = slot_nodes.pop()
+        name = getattr(node, 'slot_name', pos)
+        key = f'slot_{pos if name is None else name}'
+        slots[key] = node
+        del nodelist[pos]
+
+    return tag_name, args, kwargs, options, slots, isolated_context
+
+
+def parse_arguments(tag_name, bits, parser):
+    """
+    Parse the arguments of a component tag: positional arguments, keyword arguments (html attributes) and
+    "with" options, as filter expressions
+    """
+    args = []
+    kwargs, options = {}, {}
+
     while bits:
         bit = bits.pop(0)
 
         # if bit in options:
         #     raise TemplateSyntaxError('The %r option was specified more than once.' % bit)
 
+        if bit == 'with':
+            options = token_kwargs(bits, parser, support_legacy=False)
+            if not options:
+                raise TemplateSyntaxError('"with" in %r tag needs at least '
+                                          'one keyword argument.' % tag_name)
+            continue
+
         match = kwarg_re.match(bit)
         kwarg_format = match and match.group(1)
 
@@ -47,19 +74,4 @@ def parse_component(nodelist, token, parser):
             filter_expr = FilterExpression(bit, parser)
             args.append(filter_expr)
 
-        if bit == 'with':
-            options = token_kwargs(bits, parser, support_legacy=False)
-            if not options:
-                raise TemplateSyntaxError('"with" in %r tag needs at least '
-                                          'one keyword argument.' % tag_name)
-
-    slot_nodes = list(filter(lambda x: isinstance(x[1], Slot), enumerate(nodelist)))
-
-    while slot_nodes:
-        pos, node = slot_nodes.pop()
-        name = getattr(node, 'slot_name', pos)
-        key = f'slot_{pos if name is None else name}'
-        slots[key] = node
-        del nodelist[pos]
-
-    return tag_name, args, kwargs, options, slots, isolated_context
+    return args, kwargs, options
@@ -0,0 +1,183 @@
+from typing import Any, NamedTuple, Optional, Tuple
+
+from django.template.base import FilterExpression, Variable
+
+from .attributes import Attribute
+from .helpers import format_attributes
+
+__all__ = ['Binding', 'ComponentPlan']
+
+
+NOT_LITERAL = object()
+
+
+def literal_value(expression):
+    """
+    Get the value of the template tag argument if it is known at parse time (string/number literals without
+    filters), else NOT_LITERAL is returned.
+
+    Values that are not template expressions (e.g. already resolved python values) are literals.
+    """
+    if not isinstance(expression, FilterExpression):
+        return expression
+
+    if expression.filters:
+        return NOT_LITERAL
+
+    var = expression.var
+    if not isinstance(var, Variable):
+        return var
+
+    if var.lookups is None and not var.translate:
+        return var.literal
+
+    return NOT_LITERAL
+
+
+class Binding(NamedTuple):
+    """
+    Template tag argument bound to the place where its value is stored inside the component context.
+
+    Attributes
+    ----------
+    kind: str
+        where the value is stored (ComponentPlan.CONTEXT, ComponentPlan.CLASS or ComponentPlan.ATTRIBUTE)
+    key: str
+        name used to identify it inside the context (or as html attribute)
+    expression: Optional[FilterExpression]
+        expression resolved on every render, None if the value is known at parse time
+    value: Any
+        value known at parse time (attribute defaults and literals)
+    attribute: Optional[Attribute]
+        component attribute used to check the resolved value
+    """
+    kind: str
+    key: str
+    expression: Optional[FilterExpression]
+    value: Any
+    attribute: Optional[Attribute]
+
+    @property
+    def is_literal(self) -> bool:
+        return self.expression is None
+
+    def resolve(self, context):
+        """
+        Resolve the value of the binding using the parent template context
+        """
+        if self.expression is None:
+            return self.value
+        if self.attribute is None:
+            return self.expression.resolve(context)
+        return self.attribute.resolve(self.expression, context, name=self.key)
+
+
+class ComponentPlan:
+    """
+    Component tag arguments compiled once, when the template is parsed.
+
+    Maps every argument to the component attributes (as context, as class or as html attribute), the remaining
+    arguments to html attributes and the "with" arguments to context variables. Default values and literals are
+    checked at parse time, so rendering only has to resolve the variable expressions.
+
+    When every class and html attribute is a literal, they are folded into ``static_attributes`` and pre-formatted
+    as ``attributes``; ``dynamic_bindings`` are the remaining bindings applied on every render, in binding order
+    (so the output does not depend on which arguments are literals).
+
+    Attributes
+    ----------
+    component: BaseComponent
+        component class
+    attrs: dict
+        template tag keyword arguments
+    options: dict
+        template tag "with" keyword arguments
+    """
+
+    __slots__ = ('bindings', 'static_attributes', 'attributes', 'dynamic_bindings')
+
+    CONTEXT = 'context'
+    CLASS = 'class'
+    ATTRIBUTE = 'attribute'
+
+    def __init__(self, component, attrs: dict, options: dict):
+        attrs = dict(attrs)
+        bindings = []
+
+        # Class attributes
+        for name, key, attr in component.declared_attributes.values():
+            if attr.as_context:
+                kind = self.CONTEXT
+            elif attr.as_class:
+                kind = self.CLASS
+            else:
+                kind = self.ATTRIBUTE
+
+            if name in attrs:
+                bindings.append(self.bind_attribute(kind, key, attr, attrs.pop(name)))
+            else:
+                bindings.append(Binding(kind, key, None, attr.default, attr))
+
+        # Attribute variables
+        for name, expression in attrs.items():
+            bindings.append(self.bind(self.ATTRIBUTE, name, expression))
+
+        # Option variables
+        for name, expression in options.items():
+            bindings.append(self.bind(self.CONTEXT, name, expression))
+
+        self.bindings = tuple(bindings)
+
+        # Constant folding of html attributes, only when they are all literals since they are merged in order
+        static_attributes, dynamic_bindings = {}, []
+        folded = all(binding.is_literal for binding in self.bindings if binding.kind != self.CONTEXT)
+
+        for binding in self.bindings:
+            if not (folded and binding.is_literal) or binding.kind == self.CONTEXT:
+                dynamic_bindings.append(binding)
+            elif binding.kind == self.CLASS or binding.key == 'class':
+                if binding.value is not None:
+                    static_attributes.setdefault('class', []).append(binding.value)
+            else:
+                static_attributes[binding.key] = binding.value
+
+        self.static_attributes = static_attributes
+        self.attributes = format_attributes(static_attributes)
+        self.dynamic_bindings = tuple(dynamic_bindings)
+
+    @staticmethod
+    def bind(kind: str, key: str, expression) -> Binding:
+        value = literal_value(expression)
+        if value is NOT_LITERAL:
+            return Binding(kind, key, expression, None, None)
+        return Binding(kind, key, None, value, None)
+
+    @staticmethod
+    def bind_attribute(kind: str, key: str, attr: Attribute, expression) -> Binding:
+        value = literal_value(expression)
+        if value is not NOT_LITERAL:
+            try:
+                return Binding(kind, key, None, attr.check_value(value, raise_exception=True, name=key), attr)
+            except (Attribute.ChoiceDoesNotExist, Attribute.RequiredValue):
+                if not isinstance(expression, FilterExpression):
+                    raise
+                # Keep the expression, the error is raised while rendering as usual
+        return Binding(kind, key, expression, None, attr)
+
+    def inputs(self, values) -> Tuple[Tuple[str, str, Any], ...]:
+        """
+        Every binding with its value, given the resolved values of ``dynamic_bindings`` (e.g. to identify
+        the rendered output)
+        """
+        resolved = dict(zip(map(id, self.dynamic_bindings), values))
+        return tuple(
+            (binding.kind, binding.key, resolved.get(id(binding), binding.value)) for binding in self.bindings
+        )
+
+    @property
+    def literals(self) -> Tuple[Binding, ...]:
+        return tuple(binding for binding in self.bindings if binding.is_literal)
+
+    @property
+    def variables(self) -> Tuple[Binding, ...]:
+        return tuple(binding for binding in self.bindings if not binding.is_literal)
@@ -0,0 +1,137 @@
+import json
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional
+
+from .observers import RenderObserver
+
+__all__ = ['ProfileEntry', 'RenderProfiler']
+
+
+class ProfileEntry:
+    """
+    Render of a component node (times in seconds).
+
+    Attributes
+    ----------
+    name: str
+        component tag name
+    component: str
+        component class path
+    template_name: Optional[str]
+        component template
+    inclusive: float
+        render time, including the child renders
+    children: List[ProfileEntry]
+        components rendered while rendering this one (e.g. inside its template or its nodelist)
+    """
+
+    __slots__ = ('name', 'component', 'template_name', 'inclusive', 'children')
+
+    def __init__(self, name: str, component: str = None, template_name: Optional[str] = None):
+        self.name = name
+        self.component = component
+        self.template_name = template_name
+        self.inclusive = 0.0
+        self.children = []
+
+    @property
+    def exclusive(self) -> float:
+        """
+        Render time without the child renders
+        """
+        return max(self.inclusive - sum(child.inclusive for child in self.children), 0.0)
+
+    @property
+    def child_renders(self) -> int:
+        return len(self.children)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'component': self.component,
+            'template_name': self.template_name,
+            'inclusive_ms': round(self.inclusive * 1000, 3),
+            'exclusive_ms': round(self.exclusive * 1000, 3),
+            'child_renders': self.child_renders,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+
+class RenderProfiler(RenderObserver):
+    """
+    Records a tree with the render time of every component rendered while it is active, the tree can be dumped
+    as JSON or as folded stacks (flamegraph tools input).
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            from component_tags.template.observers import observing
+            from component_tags.template.profiling import RenderProfiler
+
+            with observing(RenderProfiler()) as profiler:
+                html = render_to_string('index.html', request=request)
+
+            profiler.to_json()  # [{"name": "card", "inclusive_ms": 1.2, "children": [...]}, ...]
+            profiler.folded()   # "card;button 120\\ncard 80\\n..." (exclusive microseconds)
+    """
+
+    def __init__(self):
+        self.root = ProfileEntry('')
+        self._stack = [self.root]
+
+    @property
+    def entries(self) -> List[ProfileEntry]:
+        """
+        Components rendered at the top level
+        """
+        return self.root.children
+
+    @property
+    def total(self) -> float:
+        return sum(entry.inclusive for entry in self.entries)
+
+    def observe(self, node, context, render):
+        component = type(node)
+        template_name = node.get_template_name()
+        entry = ProfileEntry(
+            node.tag_name,
+            f'{component.__module__}.{component.__qualname__}',
+            template_name if template_name is None or isinstance(template_name, str) else str(template_name),
+        )
+        self._stack[-1].children.append(entry)
+        self._stack.append(entry)
+
+        start = time.perf_counter()
+        try:
+            return super().observe(node, context, render)
+        finally:
+            entry.inclusive = time.perf_counter() - start
+            self._stack.pop()
+
+    def to_dict(self) -> dict:
+        return {
+            'total_ms': round(self.total * 1000, 3),
+            'components': [entry.to_dict() for entry in self.entries],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def folded(self) -> str:
+        """
+        One line per stack of component tag names with its exclusive time in microseconds
+        (e.g. "card;button 120"), as expected by flamegraph.pl or speedscope
+        """
+        stacks = OrderedDict()
+        pending = deque(((entry.name,), entry) for entry in self.entries)
+
+        while pending:
+            stack, entry = pending.popleft()
+            key = ';'.join(stack)
+            stacks[key] = stacks.get(key, 0) + entry.exclusive
+            pending.extend((stack + (child.name,), child) for child in entry.children)
+
+        return ''.join(f'{stack} {round(value * 1e6)}\n' for stack, value in stacks.items())
@@ -0,0 +1,130 @@
+import itertools
+from typing import Callable, Dict, Iterator, List, Optional, Union
+from weakref import WeakKeyDictionary, WeakSet, ref
+
+from django.forms.widgets import Media
+
+__all__ = ['ComponentEntry', 'ComponentRegistry', 'registry']
+
+_order = itertools.count()
+
+
+class ComponentEntry:
+    """
+    Component class registered as a tag of a library
+
+    Attributes
+    ----------
+    tag_name: str
+        name of the tag (e.g. "button" for ``{% button %}``)
+    library: Library
+        library declaring the tag
+    component: BaseComponent
+        component class
+    compile_function: Callable
+        compile function stored inside ``library.tags`` (see ``component_wrapper``)
+    order: int
+        registration order, the latest registration of a tag name wins
+    """
+
+    __slots__ = ('tag_name', '_library', 'component', 'compile_function', 'order')
+
+    def __init__(self, tag_name: str, library, component, compile_function: Callable):
+        self.tag_name = tag_name
+        # The registry entries are stored per library, they must not keep it alive
+        self._library = ref(library)
+        self.component = component
+        self.compile_function = compile_function
+        self.order = next(_order)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.library.name}:{self.tag_name} {self.component.__qualname__}>'
+
+    @property
+    def library(self):
+        return self._library()
+
+    @property
+    def is_registered(self) -> bool:
+        """
+        Whether the library tag is still this component (it may have been replaced by another tag)
+        """
+        library = self.library
+        return library is not None and library.tags.get(self.tag_name) is self.compile_function
+
+    @property
+    def attributes(self):
+        return self.component.declared_attributes
+
+    @property
+    def template_name(self) -> Optional[str]:
+        return getattr(self.component.meta, 'template_name', None)
+
+    @property
+    def media(self) -> Media:
+        return Media(css=self.component.meta._css, js=self.component.meta._js)
+
+
+class ComponentRegistry:
+    """
+    Component classes registered by every ``Library``, indexed by tag name and library.
+
+    Registering the same tag name again in a library replaces the previous component. When several libraries
+    register the same tag name, ``get(tag_name)`` returns the latest registration, unless the library is given.
+    Libraries (and their components) are not kept alive by the registry.
+    """
+
+    def __init__(self):
+        self._libraries: 'WeakKeyDictionary[object, Dict[str, ComponentEntry]]' = WeakKeyDictionary()
+        self._tags: Dict[str, WeakSet] = {}
+
+    def __iter__(self) -> Iterator[ComponentEntry]:
+        entries = [entry for entries in list(self._libraries.values()) for entry in entries.values()]
+        return iter(sorted((entry for entry in entries if entry.is_registered), key=lambda entry: entry.order))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, tag_name: str):
+        return self.get(tag_name) is not None
+
+    def register(self, library, tag_name: str, component, compile_function: Callable) -> ComponentEntry:
+        entry = ComponentEntry(tag_name, library, component, compile_function)
+        try:
+            self._libraries[library][tag_name] = entry
+        except KeyError:
+            self._libraries[library] = {tag_name: entry}
+        try:
+            self._tags[tag_name].add(library)
+        except KeyError:
+            self._tags[tag_name] = WeakSet([library])
+        return entry
+
+    def get(self, tag_name: str, library: Union[str, object, None] = None) -> Optional[ComponentEntry]:
+        """
+        Component registered with the tag name, inside the library (instance or name) if it is given
+        """
+        found = None
+        for candidate in list(self._tags.get(tag_name, ())):
+            if library is not None and candidate is not library and candidate.name != library:
+                continue
+            entry = self._libraries[candidate].get(tag_name)
+            if entry is not None and entry.is_registered and (found is None or entry.order > found.order):
+                found = entry
+        return found
+
+    def get_library(self, library) -> List[ComponentEntry]:
+        """
+        Components registered by the library, in registration order
+        """
+        entries = self._libraries.get(library, {}).values()
+        return sorted((entry for entry in entries if entry.is_registered), key=lambda entry: entry.order)
+
+    def get_component(self, component) -> List[ComponentEntry]:
+        """
+        Registrations of the component class
+        """
+        return [entry for entry in self if entry.component is component]
+
+
+registry = ComponentRegistry()
@@ -0,0 +1,324 @@
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+
+import django
+from django.forms.widgets import Media
+from django.http import StreamingHttpResponse
+from django.template import Context, TemplateDoesNotExist, loader
+from django.template.base import (
+    Node, NodeList, Template, TextNode, Variable, VariableDoesNotExist, VariableNode, render_value_in_context,
+)
+from django.template.context import make_context
+from django.template.defaulttags import ForNode, IfNode, WithNode
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+
+from .helpers import LazyRender
+from .media import MediaNode, get_media_collector
+
+__all__ = ['iter_node', 'iter_template', 'join_chunks', 'register_streamer', 'stream', 'stream_response']
+
+# Nodes rendered as several chunks, the other nodes are rendered at once. Nodes defining a ``stream(context)``
+# method (e.g. components) are streamed by it.
+STREAMERS: Dict[type, Callable[[Node, Context], Iterator[str]]] = {}
+
+# Chunks smaller than this are joined before being yielded by ``stream()``
+CHUNK_SIZE = 4096
+
+# Django versions whose ForNode, BlockNode and ExtendsNode ``render()`` are mirrored by their streamers (they use
+# private internals), these nodes are rendered at once with any other version
+STREAMED_DJANGO_VERSIONS = ((2, 2), (3, 0), (3, 1))
+
+
+def register_streamer(node_class):
+    """
+    Register the function yielding the output of the node class in chunks, e.g.::
+
+        @register_streamer(MyNode)
+        def stream_my_node(node, context):
+            yield from iter_node(node.nodelist, context)
+    """
+    def decorator(func):
+        STREAMERS[node_class] = func
+        return func
+    return decorator
+
+
+def iter_node(node: Union[Node, NodeList], context: Context) -> Iterator[str]:
+    """
+    Yield the output of the node (or nodelist) in chunks, the result is the same as ``node.render(context)``.
+    Nodes without a ``stream`` method nor a registered streamer (including subclasses of the streamed node classes)
+    are rendered at once.
+    """
+    if isinstance(node, NodeList):
+        for child in node:
+            yield from iter_node(child, context)
+        return
+
+    stream = getattr(node, 'stream', None)
+    if stream is not None:
+        yield from stream(context)
+        return
+
+    streamer = STREAMERS.get(type(node))
+    if streamer is not None:
+        yield from streamer(node, context)
+    else:
+        yield node.render_annotated(context)
+
+
+def iter_template(template: Template, context: Context) -> Iterator[str]:
+    """
+    Same as ``template.render(context)``, yielding the output in chunks
+    """
+    with context.render_context.push_state(template):
+        if context.template is None:
+            with context.bind_template(template):
+                context.template_name = template.name
+                yield from iter_node(template.nodelist, context)
+        else:
+            yield from iter_node(template.nodelist, context)
+
+
+def stream(template, context: Optional[Union[dict, Context]] = None, request=None,
+           chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Render the template (name, backend template or ``django.template.Template``) yielding the output in chunks as
+    components are rendered, consecutive chunks are joined until they reach "chunk_size" characters.
+
+    Media collected before ``{% components_css %}`` can be known is predicted from the components used by the
+    rest of the template (including components inside conditions that may not be rendered), media of components
+    that could not be predicted (e.g. rendered by ``{% include %}``) is yielded after the rest of the template.
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            return StreamingHttpResponse(stream('dashboard.html', {'widgets': widgets}, request=request))
+    """
+    if isinstance(template, str):
+        template = loader.get_template(template)
+
+    # backends.django.Template
+    if hasattr(template, 'template'):
+        context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+        template = template.template
+    elif not isinstance(context, Context):
+        context = make_context(context, request, autoescape=template.engine.autoescape)
+
+    yield from join_chunks(iter_template(template, context), chunk_size)
+
+
+def join_chunks(chunks: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Join consecutive chunks until they reach "chunk_size" characters, empty chunks are dropped
+    """
+    buffer, size = [], 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_response(request, template_name, context: Optional[dict] = None, content_type: Optional[str] = None,
+                    status: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> StreamingHttpResponse:
+    """
+    Same as ``django.shortcuts.render``, returning a ``StreamingHttpResponse``
+    """
+    template = loader.get_template(template_name) if isinstance(template_name, str) else template_name
+    return StreamingHttpResponse(stream(template, context, request, chunk_size), content_type, status)
+
+
+@register_streamer(VariableNode)
+def stream_variable(node: VariableNode, context: Context) -> Iterator[str]:
+    # Component nodelist and slots (e.g. "{{ nodelist }}") are streamed, unless they are already rendered
+    if node.filter_expression.filters or not isinstance(node.filter_expression.var, Variable):
+        yield node.render_annotated(context)
+        return
+
+    value = node.filter_expression.resolve(context)
+    if isinstance(value, LazyRender):
+        yield from value.stream(iter_node)
+    else:
+        yield render_value_in_context(value, context)
+
+
+@register_streamer(IfNode)
+def stream_if(node: IfNode, context: Context) -> Iterator[str]:
+    for condition, nodelist in node.conditions_nodelists:
+        if condition is not None:
+            try:
+                match = condition.eval(context)
+            except VariableDoesNotExist:
+                match = None
+        else:
+            match = True
+
+        if match:
+            yield from iter_node(nodelist, context)
+            return
+
+
+@register_streamer(WithNode)
+def stream_with(node: WithNode, context: Context) -> Iterator[str]:
+    values = {key: value.resolve(context) for key, value in node.extra_context.items()}
+    with context.push(**values):
+        yield from iter_node(node.nodelist, context)
+
+
+def stream_for(node: ForNode, context: Context) -> Iterator[str]:
+    # Same as ForNode.render
+    parentloop = context['forloop'] if 'forloop' in context else {}
+    with context.push():
+        values = node.sequence.resolve(context, ignore_failures=True)
+        if values is None:
+            values = []
+        if not hasattr(values, '__len__'):
+            values = list(values)
+        len_values = len(values)
+        if len_values < 1:
+            yield from iter_node(node.nodelist_empty, context)
+            return
+
+        if node.is_reversed:
+            values = reversed(values)
+        num_loopvars = len(node.loopvars)
+        unpack = num_loopvars > 1
+        loop_dict = context['forloop'] = {'parentloop': parentloop}
+        for i, item in enumerate(values):
+            loop_dict['counter0'] = i
+            loop_dict['counter'] = i + 1
+            loop_dict['revcounter'] = len_values - i
+            loop_dict['revcounter0'] = len_values - i - 1
+            loop_dict['first'] = (i == 0)
+            loop_dict['last'] = (i == len_values - 1)
+
+            pop_context = False
+            if unpack:
+                try:
+                    len_item = len(item)
+                except TypeError:  # not an iterable
+                    len_item = 1
+                if num_loopvars != len_item:
+                    raise ValueError(f'Need {num_loopvars} values to unpack in for loop; got {len_item}. ')
+                context.update(dict(zip(node.loopvars, item)))
+                pop_context = True
+            else:
+                context[node.loopvars[0]] = item
+
+            yield from iter_node(node.nodelist_loop, context)
+
+            if pop_context:
+                context.pop()
+
+
+def stream_block(node: BlockNode, context: Context) -> Iterator[str]:
+    # Same as BlockNode.render
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    with context.push():
+        if block_context is None:
+            context['block'] = node
+            yield from iter_node(node.nodelist, context)
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            block = type(node)(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+            yield from iter_node(block.nodelist, context)
+            if push is not None:
+                block_context.push(node.name, push)
+
+
+def stream_extends(node: ExtendsNode, context: Context) -> Iterator[str]:
+    # Same as ExtendsNode.render
+    compiled_parent = node.get_parent(context)
+
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+
+    for child in compiled_parent.nodelist:
+        if not isinstance(child, TextNode):
+            if not isinstance(child, ExtendsNode):
+                block_context.add_blocks({n.name: n for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode)})
+            break
+
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from iter_node(compiled_parent.nodelist, context)
+
+
+if django.VERSION[:2] in STREAMED_DJANGO_VERSIONS:
+    register_streamer(ForNode)(stream_for)
+    register_streamer(BlockNode)(stream_block)
+    register_streamer(ExtendsNode)(stream_extends)
+
+
+@register_streamer(MediaNode)
+def stream_media(node: MediaNode, context: Context) -> Iterator[str]:
+    components = find_components(node.nodelist, context)
+
+    # Usually {% components_js %}, there are no components after it
+    if not components:
+        yield node.render(context)
+        return
+
+    predicted = Media()
+    for media in components.values():
+        predicted = predicted + media
+    tags = node.get_tags(predicted)
+    yield ''.join(tags)
+
+    yield from iter_node(node.nodelist, context)
+
+    collector = get_media_collector(context)
+    if collector:
+        late = [tag for tag in node.get_tags(collector.media) if tag not in tags]
+        yield ''.join(late)
+
+
+def find_components(nodelist: NodeList, context: Context, found: Optional[dict] = None,
+                    templates: Optional[set] = None) -> Dict[type, Media]:
+    """
+    Media of the component classes used by the nodelist, the templates of the components and the blocks
+    overriding its blocks, in order of appearance
+    """
+    from .nodes import ComponentNode
+
+    found = {} if found is None else found
+    templates = set() if templates is None else templates
+
+    for node in nodelist:
+        if isinstance(node, ComponentNode):
+            found.setdefault(type(node), node.meta)
+            find_components(node.nodelist, context, found, templates)
+            find_components(NodeList(node.slots.values()), context, found, templates)
+
+            try:
+                template = node.resolve_template(context)
+            except (ComponentNode.TemplateIsNull, TemplateDoesNotExist):
+                continue
+            if isinstance(template, Template) and template not in templates:
+                templates.add(template)
+                find_components(template.nodelist, context, found, templates)
+            continue
+
+        if isinstance(node, BlockNode):
+            block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+            for block in (block_context.blocks.get(node.name, ()) if block_context else ()):
+                find_components(block.nodelist, context, found, templates)
+
+        for name in node.child_nodelists:
+            child = getattr(node, name, None)
+            if child:
+                find_components(child, context, found, templates)
+
+    return found
@@ -0,0 +1,103 @@
+import gc
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.template import Engine, TemplateDoesNotExist, TemplateSyntaxError, engines
+
+from .analysis import get_references
+from .nodes import BaseComponent
+from .registry import registry
+
+__all__ = ['WarmupResult', 'get_components', 'warm']
+
+
+class WarmupResult:
+    """
+    Summary of a ``warm()`` call
+
+    Attributes
+    ----------
+    components: int
+        number of component classes found inside the template libraries
+    templates: int
+        number of component templates loaded and compiled
+    errors: List[Tuple[str, str]]
+        components whose template could not be loaded, as (tag name, error message)
+    seconds: float
+        time spent warming the components
+    frozen: bool
+        whether ``gc.freeze()`` was called
+    """
+
+    def __init__(self):
+        self.components = 0
+        self.templates = 0
+        self.errors: List[Tuple[str, str]] = []
+        self.seconds = 0.0
+        self.frozen = False
+
+
+def get_engines() -> List[Engine]:
+    """
+    Django template engines declared by ``settings.TEMPLATES`` (their libraries are imported when they are created)
+    """
+    return [backend.engine for backend in engines.all() if isinstance(getattr(backend, 'engine', None), Engine)]
+
+
+def get_components(engine: Engine) -> Iterator[Tuple[str, BaseComponent]]:
+    """
+    Component tags registered by the builtins and libraries of the template engine, as (tag name, component class)
+    """
+    seen = set()
+    for library in [*engine.template_builtins, *engine.template_libraries.values()]:
+        for entry in registry.get_library(library):
+            if (entry.tag_name, entry.component) not in seen:
+                seen.add((entry.tag_name, entry.component))
+                yield entry.tag_name, entry.component
+
+
+def warm(engines: Optional[Iterable[Engine]] = None, freeze: bool = False) -> WarmupResult:
+    """
+    Import the template libraries, merge the meta of every registered component class and load, compile and
+    analyze their templates, so the first request of a worker does not pay for it.
+
+    Call it once the apps are ready (e.g. at the end of ``wsgi.py`` or in a gunicorn ``post_fork`` hook), with
+    ``freeze=True`` before forking the workers (e.g. gunicorn ``--preload``) the objects created so far are moved
+    to the permanent generation, therefore the garbage collector does not touch (and copy) the shared pages.
+
+    Examples
+    --------
+
+        .. code-block:: python
+
+            # wsgi.py
+            application = get_wsgi_application()
+            warm(freeze=True)
+    """
+    result = WarmupResult()
+    start = time.perf_counter()
+
+    for engine in (get_engines() if engines is None else engines):
+        for name, component in get_components(engine):
+            result.components += 1
+
+            template_name = getattr(component.meta, 'template_name', None)
+            if not template_name:
+                continue
+
+            try:
+                template = component._template_cache.get_template(engine, template_name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                result.errors.append((name, f'{type(e).__name__}: {e}'))
+                continue
+
+            get_references(getattr(template, 'template', template))
+            result.templates += 1
+
+    if freeze and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+        result.frozen = True
+
+    result.seconds = time.perf_counter() - start
+    return result
@@ -1,11 +1,70 @@
-from django.template import Context
-from django.template.base import Variable
-from django.test import TestCase
+import asyncio
+import gc
+import itertools
+import json
+import threading
+from unittest import mock, skipUnless
+from io import StringIO
+from pathlib import Path
 
+from asgiref.sync import async_to_sync
+from django.template import Context, Engine, TemplateSyntaxError
+from django.template.base import FilterExpression, NodeList, TextNode, Variable, VariableNode
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import BlockNode, ExtendsNode
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.widgets import Media
+from django.http import HttpResponse, StreamingHttpResponse
+from django.templatetags import i18n, tz
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.autoreload import file_changed
+from django.utils import timezone, translation
+from django.utils.html import conditional_escape
+from django.utils.safestring import SafeString, mark_safe
+
+from . import template
 from .template.choices import AttributeChoices
 from .template.attributes import Attribute
 from .template.builtins import register
 from .template.components import Slot
+from .template.analysis import get_references, is_referenced
+from .template.asynchronous import ASYNC_LOADER_CONTEXT_KEY, AsyncDataLoader, arender
+from .template.cache import PureCache, get_render_memo, pure_cache
+from .template.context import ComponentContext
+from .template.helpers import ContextFrame, LazyRender
+from .template.loading import TemplateCache, reset_template_caches
+from .template.media import MediaCollector, get_media_collector
+from .template.metrics import MetricsRecorder, PrometheusExporter, get_exporter
+from .template.observers import RenderObserver, get_observer, observing
+from .template import parallel
+from .template.plan import ComponentPlan
+from .template.registry import registry
+from .template.streaming import STREAMERS, stream, stream_response
+from .template.warmup import warm
+from .template.profiling import RenderProfiler
+from .middleware import ComponentMetricsMiddleware, ComponentProfilerMiddleware, metrics
+
+
+def make_engine(templates: dict, *libraries):
+    """
+    Template engine with in-memory templates, builtin component tags and the given component libraries
+    """
+    engine = Engine(loaders=[
+        ('django.template.loaders.locmem.Loader', templates),
+        'django.template.loaders.app_directories.Loader',
+    ])
+    engine.template_builtins.extend([register, *libraries])
+    return engine
+
+
+def js_tag(path: str) -> str:
+    """
+    Script tag of a static file as rendered by the installed Django version
+    """
+    return Media(js=[path]).render_js()[0]
 
 
 class ChoiceTestCase(TestCase):
@@ -23,6 +82,101 @@ class ChoiceTestCase(TestCase):
         self.assertIsInstance(format(FooChoices.bar), str)
 
 
+class AsyncTestCase(TestCase):
+
+    def setUp(self):
+        calls = self.calls = []
+        hooks = self.hooks = []
+
+        class Card(template.Component):
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'card.html'
+
+            async def aget_context_data(self, values):
+                calls.append(values['title'])
+                for hook in hooks:
+                    await hook()
+                return {'data': values['title'].upper(), 'page': values.get('page')}
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+
+            async def aget_context_data(self, values):
+                calls.append('icon')
+                return {'name': f'icon-{values["card"]}'}
+
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        self.engine = make_engine({
+            'card.html': '<div>{{ data }}{{ page }}{% icon with card=data %}{% endicon %}{{ nodelist }}</div>',
+            'icon.html': '<i>{{ name }}</i>',
+        }, library)
+
+    def test_arender(self):
+        page = self.engine.from_string(
+            '{% for item in items %}{% card title=item %}{{ title }}{% endcard %}{% endfor %}'
+        )
+
+        # Every card waits until the 3 of them are loading, it times out if they are loaded one after another
+        started, ready = [], asyncio.Event()
+
+        async def barrier():
+            started.append(None)
+            if len(started) == 3:
+                ready.set()
+            await asyncio.wait_for(ready.wait(), timeout=5)
+
+        self.hooks.append(barrier)
+        # Async test methods are only supported by Django >= 3.1
+        output = async_to_sync(arender)(page, {'items': ['a', 'b', 'c'], 'page': 'P'})
+
+        self.assertEqual(
+            output,
+            '<div>AP<i>icon-A</i>a</div><div>BP<i>icon-B</i>b</div><div>CP<i>icon-C</i>c</div>',
+        )
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'icon', 'icon', 'icon'])
+
+    def test_loader(self):
+        page = self.engine.from_string('{% card title="a" %}{% endcard %}{% card title="b" %}{% endcard %}')
+        context = Context()
+        loader = AsyncDataLoader()
+        context.render_context.dicts[0][ASYNC_LOADER_CONTEXT_KEY] = loader
+
+        self.assertEqual(page.render(context), '')
+        self.assertEqual(len(loader.pending), 2)
+        async_to_sync(loader.load)()
+        self.assertEqual(loader.rounds, 1)
+        self.assertEqual(
+            sorted(loader.loaded.values(), key=str), [{'data': 'A', 'page': None}, {'data': 'B', 'page': None}],
+        )
+
+    def test_loop(self):
+        # The data depends on the parent context, identical components are not deduplicated
+        class Row(template.Component):
+            class Meta:
+                template_name = 'row.html'
+
+            async def aget_context_data(self, values):
+                return {'row': values['row']}
+
+        library = template.Library()
+        library.tag('row', Row)
+        engine = make_engine({'row.html': '[{{ row }}]'}, library)
+        page = engine.from_string('{% for row in rows %}{% row %}{% endrow %}{% endfor %}')
+
+        self.assertEqual(page.render(Context({'rows': [1, 2, 3]})), '[1][2][3]')
+        self.assertEqual(async_to_sync(arender)(page, {'rows': [1, 2, 3]}), '[1][2][3]')
+
+    def test_render(self):
+        # The data is loaded synchronously outside arender()
+        output = self.engine.from_string('{% card title="a" %}x{% endcard %}').render(Context({'page': 'P'}))
+        self.assertEqual(output, '<div>AP<i>icon-A</i>x</div>')
+
+
 class AttributeTestCase(TestCase):
 
     def setUp(self):
@@ -34,12 +188,32 @@ class AttributeTestCase(TestCase):
     def test_is_instance(self):
         self.assertIsInstance(Attribute(), Attribute)
 
+    def test_slots(self):
+        class CustomAttribute(Attribute):
+            pass
+
+        self.assertFalse(hasattr(Attribute(), '__dict__'))
+        attr = CustomAttribute(default='foo')
+        attr.extra = 'bar'
+        self.assertEqual((attr.default, attr.extra), ('foo', 'bar'))
+
     def test_choices(self):
         attr = Attribute(choices=self.choices)
         x = Variable('attr')
         c = Context({'attr': 'foo'})
         self.assertEqual(attr.resolve(x, c), 'bar')
 
+    def test_choices_lookup(self):
+        class SwappedChoices(AttributeChoices):
+            foo = 'bar'
+            bar = 'foo'
+
+        attr = Attribute(choices=SwappedChoices)
+        self.assertEqual(attr.get_choice('foo'), 'bar')
+        self.assertEqual(attr.get_choice(SwappedChoices.bar), 'foo')
+        self.assertEqual(attr.get_choice(SwappedChoices.foo), 'bar')
+        self.assertIsNone(attr.get_choice('baz'))
+
     def test_choice_does_not_exist(self):
         attr = Attribute(choices=self.choices, required=True)
         x = Variable('attr')
@@ -106,6 +280,236 @@ class AttributeTestCase(TestCase):
         self.assertEqual(attr.context_name, 'foo')
 
 
+class BatchTestCase(TestCase):
+
+    def setUp(self):
+        templates = self.templates = []
+
+        class Row(template.Component):
+            color = template.Attribute(default='gray', as_class=True)
+
+            class Meta:
+                template_name = 'row.html'
+                css = {'all': ['row.css']}
+
+            def get_template(self, context):
+                templates.append(self.tag_name)
+                return super().get_template(context)
+
+        self.Row = Row
+        library = template.Library()
+        library.tag('row', Row)
+        self.engine = make_engine(
+            {'row.html': '<tr {{ attributes }}><td>{{ row.name }}</td>{{ selected }}</tr>'}, library,
+        )
+        self.rows = [{'pk': 1, 'name': 'a'}, {'pk': 2, 'name': 'b'}, {'pk': 3, 'name': 'c'}]
+
+    def render(self, source, **kwargs):
+        return self.engine.from_string(source).render(Context(kwargs))
+
+    def test_render_each(self):
+        output = self.render(
+            '{% components_css %}{% render_each row rows as row id=row.pk color=color with selected=selected %}',
+            rows=self.rows, color='red', selected='*',
+        )
+        self.assertEqual(output, self.render(
+            '{% components_css %}{% for row in rows %}'
+            '{% row id=row.pk color=color with row=row selected=selected %}{% endrow %}{% endfor %}',
+            rows=self.rows, color='red', selected='*',
+        ))
+        self.assertEqual(
+            output,
+            '<link href="/static/row.css" type="text/css" media="all" rel="stylesheet">'
+            '<tr class="red" id="1"><td>a</td>*</tr><tr class="red" id="2"><td>b</td>*</tr>'
+            '<tr class="red" id="3"><td>c</td>*</tr>',
+        )
+        # Once per batch, once per item in the for loop
+        self.assertEqual(self.templates, ['row'] + ['row'] * 3)
+
+    def test_render_each_empty(self):
+        self.assertEqual(self.render('{% components_css %}{% render_each row rows as row %}', rows=[]), '')
+        self.assertEqual(self.render('{% render_each row missing as row %}'), '')
+
+    def test_render_each_syntax(self):
+        with self.assertRaises(TemplateSyntaxError):
+            self.engine.from_string('{% render_each row rows %}')
+        with self.assertRaises(TemplateSyntaxError):
+            self.engine.from_string('{% render_each components_css rows as row %}')
+        with self.assertRaises(TemplateSyntaxError):
+            self.engine.from_string('{% render_each row rows as row "class" %}')
+
+    def test_render_each_stream(self):
+        chunks = list(stream(self.engine.from_string('{% render_each row rows as row %}'), {'rows': self.rows},
+                             chunk_size=1))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0], '<tr class="gray"><td>a</td></tr>')
+
+    def test_render_many(self):
+        settings = {'BACKEND': 'django.template.backends.django.DjangoTemplates', 'OPTIONS': {
+            'loaders': [('django.template.loaders.locmem.Loader', {'row.html': '<tr {{ attributes }}>{{ row }}</tr>'})],
+        }}
+        with override_settings(TEMPLATES=[settings]):
+            output = self.Row.render_many(['a', 'b'], item_name='row', color='blue')
+            self.assertEqual(output, '<tr class="blue">a</tr><tr class="blue">b</tr>')
+
+            chunks = list(self.Row.iter_many(range(100), item_name='row', chunk_size=100))
+            self.assertLess(len(chunks), 100)
+            self.assertTrue(all(len(chunk) >= 100 for chunk in chunks[:-1]))
+            self.assertEqual(''.join(chunks), ''.join(f'<tr class="gray">{i}</tr>' for i in range(100)))
+
+
+class AnalysisTestCase(TestCase):
+
+    def setUp(self):
+        self.rendered = []
+
+        class Panel(template.Component):
+            class Meta:
+                template_name = 'panel.html'
+
+        library = template.Library()
+        library.tag('panel', Panel)
+
+        @library.simple_tag
+        def probe(name):
+            self.rendered.append(name)
+            return name
+
+        @library.simple_tag(takes_context=True)
+        def context_probe(context):
+            return ''
+
+        self.engine = make_engine({
+            'panel.html': '<div>{% if slot_header %}{{ slot_header|upper }}{% endif %}</div>',
+            'layout.html': '{% block content %}{{ nodelist }}{% endblock %}',
+            'page.html': '{% extends "layout.html" %}{% block content %}{% include "part.html" %}{% endblock %}',
+            'part.html': '{% for item in slot_items %}{% with name=item.name %}{{ name }}{% endwith %}{% endfor %}',
+            'dynamic.html': '{% include name %}',
+            'context.html': '{% context_probe %}',
+            'nested.html': '{% panel with title=slot_title %}{{ nodelist }}{% slot "header" %}{{ name }}{% endslot %}'
+                           '{% endpanel %}',
+        }, library)
+
+    def test_references(self):
+        self.assertEqual(get_references(self.engine.get_template('panel.html')), {'slot_header'})
+        self.assertEqual(get_references(self.engine.get_template('page.html')),
+                         {'nodelist', 'slot_items', 'item', 'name'})
+        self.assertEqual(get_references(self.engine.get_template('component_tags/slot.html')), {'nodelist'})
+        self.assertEqual(get_references(self.engine.get_template('nested.html')), {'nodelist', 'slot_title', 'name'})
+
+    def test_unknown_references(self):
+        self.assertIsNone(get_references(self.engine.get_template('dynamic.html')))
+        self.assertIsNone(get_references(self.engine.get_template('context.html')))
+
+    def test_references_are_cached(self):
+        panel = self.engine.get_template('panel.html')
+        self.assertIs(get_references(panel), get_references(panel))
+
+    def test_is_referenced(self):
+        self.assertTrue(is_referenced('nodelist', None))
+        self.assertTrue(is_referenced('nodelist', frozenset(['nodelist'])))
+        self.assertFalse(is_referenced('nodelist', frozenset()))
+
+    def test_unreferenced_nodes_are_not_rendered(self):
+        output = self.engine.from_string(
+            '{% panel %}{% probe "body" %}{% slot "header" %}{% probe "header" %}{% endslot %}'
+            '{% slot "footer" %}{% probe "footer" %}{% endslot %}{% endpanel %}'
+        ).render(Context())
+
+        self.assertEqual(output, '<div>\n    HEADER\n</div>')
+        self.assertEqual(self.rendered, ['header'])
+
+
+class LazyRenderTestCase(TestCase):
+
+    def setUp(self):
+        self.rendered = []
+
+        class Tabs(template.Component):
+            open = template.Attribute(default=False, as_context=True)
+
+            class Meta:
+                template_name = 'tabs.html'
+
+        library = template.Library()
+        library.tag('tabs', Tabs)
+
+        @library.simple_tag
+        def probe(name):
+            self.rendered.append(name)
+            return name
+
+        self.engine = make_engine({
+            'tabs.html': '{% if open %}{{ nodelist }}{{ nodelist }}{% with name="tabs" %}{{ nodelist }}{% endwith %}'
+                         '{% endif %}{% if slot_title %}[{{ slot_title|length }}]{% endif %}',
+        }, library)
+
+    def render(self, source, **kwargs):
+        return self.engine.from_string(source).render(Context(kwargs))
+
+    def test_lazy_render(self):
+        lazy = LazyRender(NodeList([TextNode('foo')]), Context())
+        self.assertFalse(lazy.rendered)
+        self.assertTrue(lazy)
+        self.assertTrue(lazy.rendered)
+        self.assertEqual(lazy, 'foo')
+        self.assertEqual(lazy.upper(), 'FOO')
+        self.assertEqual(conditional_escape(lazy), 'foo')
+        self.assertFalse(LazyRender(NodeList(), Context()))
+
+    def test_lazy_render_frame(self):
+        context = Context({'name': 'foo'})
+        lazy = LazyRender(NodeList([VariableNode(FilterExpression('name', None))]), ContextFrame(context))
+        with context.push(name='bar'):
+            self.assertEqual(lazy, 'foo')
+            self.assertEqual(context['name'], 'bar')
+
+    def test_lazy_render_frame_values(self):
+        # Values set by the component template before rendering the nodelist are not visible to it
+        library = template.Library()
+        meta = type('Meta', (), {'template_name': 'f.html'})
+        library.tag('tabs', type('Tabs', (template.Component,), {'Meta': meta}))
+        engine = make_engine({
+            'f.html': '{% firstof "tab" as name %}{% with "x" as other %}[{{ name }}]{{ nodelist }}{% endwith %}'
+                      '{{ slot_footer }}',
+        }, library)
+        output = engine.from_string(
+            '{% tabs %}{{ name|default:"-" }}{{ other|default:"-" }}{% firstof "body" as name %}'
+            '{% slot "footer" %}{{ name|default:"-" }}{% endslot %}{% endtabs %}'
+        ).render(Context({'name': 'page'}))
+        self.assertEqual(output, '[tab]--\n    -\n')
+
+    def test_filters(self):
+        # Same output as the rendered string
+        library = template.Library()
+        meta = type('Meta', (), {'template_name': 'f.html'})
+        library.tag('tabs', type('Tabs', (template.Component,), {'Meta': meta}))
+        engine = make_engine({'f.html': '{{ nodelist|first }}|{{ nodelist|last }}|{{ nodelist|slice:":3" }}|'
+                                        '{{ nodelist|random }}|{{ nodelist|json_script:"data" }}|'
+                                        '{{ nodelist|length }}|{{ nodelist|upper }}|{{ nodelist|make_list|join:"," }}'},
+                             library)
+        output = engine.from_string('{% tabs %}aaaaa{% endtabs %}').render(Context())
+        self.assertEqual(
+            output, 'a|a|aaa|a|<script id="data" type="application/json">"aaaaa"</script>|5|AAAAA|a,a,a,a,a',
+        )
+
+        lazy = LazyRender(NodeList([TextNode('abc')]), Context())
+        self.assertEqual((lazy[1], lazy[-2:], lazy < 'b', '%s!' % lazy, lazy * 2, f'{lazy:>4}'),
+                         ('b', 'bc', True, 'abc!', 'abcabc', ' abc'))
+        self.assertEqual(json.dumps(lazy, cls=DjangoJSONEncoder), '"abc"')
+
+    def test_nodelist_is_rendered_on_first_use(self):
+        output = self.render('{% tabs open=open with name="page" %}{% probe name %}{% endtabs %}', open=True)
+        self.assertEqual(output, 'pagepagepage')
+        self.assertEqual(self.rendered, ['page'])
+
+    def test_nodelist_is_not_rendered_if_unused(self):
+        output = self.render('{% tabs open=open %}{% probe "body" %}{% slot "title" %}{% probe "title" %}{% endslot %}'
+                             '{% endtabs %}', open=False)
+        self.assertEqual(output, '[11]')
+        self.assertEqual(self.rendered, ['title'])
+
+
 class BuiltinsTestCase(TestCase):
 
     def setUp(self) -> None:
@@ -119,12 +523,635 @@ class BuiltinsTestCase(TestCase):
             self.assertTrue(issubclass(register.tags[name].__wrapped__, Slot))
 
 
+class SlotTestCase(TestCase):
+
+    def setUp(self):
+        class Card(template.Component):
+            class Meta:
+                template_name = 'card.html'
+
+        self.library = template.Library()
+        self.library.tag('card', Card)
+        self.templates = {
+            'card.html': '<div>{{ nodelist }}</div><footer>{{ slot_footer }}</footer>',
+            'custom_slot.html': '{% extends "component_tags/slot.html" %}',
+        }
+        self.source = ('{% card with name=name %}Body{% slot "footer" with label=name %}{{ label }}: {{ request }}'
+                       '{% endslot %}{% endcard %}')
+        self.output = '<div>Body</div><footer>\n    Foo: bar\n</footer>'
+
+    def test_inline_render(self):
+        # The slot template is not available, therefore it is not loaded
+        engine = Engine(loaders=[('django.template.loaders.locmem.Loader', self.templates)])
+        engine.template_builtins.extend([register, self.library])
+
+        context = Context({'name': 'Foo'})
+        context.request = 'bar'
+        self.assertEqual(engine.from_string(self.source).render(context), self.output)
+
+    def test_inline_render_default_template(self):
+        engine = make_engine(self.templates, self.library)
+        page = engine.from_string(self.source)
+        context = Context({'name': 'Foo'})
+        context.request = 'bar'
+        self.assertEqual(page.render(context), self.output)
+        with context.bind_template(page):
+            self.assertTrue(page.nodelist[0].slots['slot_footer'].is_inline(context))
+
+    def test_overridden_template(self):
+        for name, source, output in [
+            ('component_tags/slot.html', '<div class="slot">{{ nodelist }}</div>', '<div class="slot">Foo: bar</div>'),
+            ('component_tags/base.html', '<p>{% block content %}{{ nodelist }}{% endblock %}</p>', '<p>Foo: bar</p>'),
+        ]:
+            engine = make_engine(dict(self.templates, **{name: source}), self.library)
+            context = Context({'name': 'Foo'})
+            context.request = 'bar'
+            self.assertEqual(
+                engine.from_string(self.source).render(context), f'<div>Body</div><footer>{output}</footer>',
+            )
+
+    def test_template_render(self):
+        class CustomSlot(Slot):
+            class Meta:
+                template_name = 'custom_slot.html'
+
+        self.library.tag('slot', CustomSlot)
+        engine = make_engine(self.templates, self.library)
+
+        context = Context({'name': 'Foo'})
+        context.request = 'bar'
+        self.assertEqual(engine.from_string(self.source).render(context), self.output)
+
+
 class ComponentTestCase(TestCase):
-    pass
 
+    def setUp(self):
+        self.library = template.Library()
 
-class ContextTestCase(TestCase):
-    pass
+        class Button(template.Component):
+            class ColorChoices(template.AttributeChoices):
+                primary = 'btn-primary'
+                secondary = 'btn-secondary'
+
+            color = template.Attribute(choices=ColorChoices, default=ColorChoices.primary, as_class=True)
+            size = template.Attribute(default='btn-md', as_class=True)
+            href = template.Attribute(default='#', context_name='data-href')
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'button.html'
+
+        self.Button = Button
+        self.library.tag('button', Button)
+        self.engine = make_engine({'button.html': '<button {{ attributes }}>{{ title }}{{ nodelist }}</button>'},
+                                  self.library)
+
+    def render(self, source, **kwargs):
+        return self.engine.from_string(source).render(Context(kwargs))
+
+    def test_declared_attributes(self):
+        self.assertEqual(list(self.Button.declared_attributes), ['color', 'size', 'href', 'title'])
+        self.assertEqual(self.Button.declared_attributes['href'].context_name, 'data-href')
+        self.assertEqual(self.Button.declared_attributes['title'].context_name, 'title')
+        self.assertIs(self.Button.declared_attributes['title'].attribute, self.Button.title)
+
+    def test_declared_attributes_are_immutable(self):
+        with self.assertRaises(TypeError):
+            self.Button.declared_attributes['foo'] = Attribute()
+
+    def test_declared_attributes_inheritance(self):
+        class Submit(self.Button):
+            size = None
+            href = template.Attribute(default='/submit')
+            type = template.Attribute(default='submit')
+
+        self.assertEqual(list(Submit.declared_attributes), ['color', 'href', 'title', 'type'])
+        self.assertEqual(Submit.declared_attributes['href'].context_name, 'href')
+        self.assertEqual(list(self.Button.declared_attributes), ['color', 'size', 'href', 'title'])
+
+    def test_render_attributes(self):
+        self.assertEqual(
+            self.render('{% button color="secondary" title="Foo" %}Bar{% endbutton %}'),
+            '<button class="btn-secondary btn-md" data-href="#">FooBar</button>'
+        )
+
+    def test_required_value_error(self):
+        class Link(self.Button):
+            label = template.Attribute(required=True, as_context=True)
+            target = template.Attribute(required=True, context_name='data-target')
+
+        self.library.tag('link', Link)
+        with self.assertRaisesMessage(Attribute.RequiredValue, 'label should be different than null'):
+            self.render('{% link label=none target="x" %}{% endlink %}', none=None)
+        with self.assertRaisesMessage(Attribute.RequiredValue, 'data-target should be different than null'):
+            self.render('{% link label="x" target=None %}{% endlink %}')
+
+    def test_meta_is_cached(self):
+        node = self.Button('button', NodeList(), {}, {})
+        self.assertIs(node.meta, self.Button.meta)
+        self.assertIs(node.meta, self.Button('button', NodeList(), {}, {}).meta)
+        self.assertEqual(node.meta.template_name, 'button.html')
+
+    def test_meta_inheritance(self):
+        class Submit(self.Button):
+            class Meta:
+                css = {'all': ['submit.css']}
+
+        self.assertIsNot(Submit.meta, self.Button.meta)
+        self.assertEqual(Submit.meta.template_name, 'button.html')
+        self.assertEqual(Submit.meta._css, {'all': ['submit.css']})
+        self.assertEqual(self.Button.meta._css, {})
+
+    def test_reset_meta(self):
+        class Submit(self.Button):
+            pass
+
+        meta = Submit.meta
+        self.Button.Meta.template_name = 'submit.html'
+        self.assertIs(Submit.meta, meta)
+
+        self.Button.reset_meta()
+        self.assertEqual(self.Button.meta.template_name, 'submit.html')
+        self.assertEqual(Submit.meta.template_name, 'submit.html')
+
+    def test_render_variables(self):
+        self.assertEqual(
+            self.render('{% button color=color id=id title=title %}{% endbutton %}', color='secondary', id='foo',
+                        title='Bar'),
+            '<button class="btn-secondary btn-md" data-href="#" id="foo">Bar</button>'
+        )
+
+    def test_render_literals(self):
+        self.assertEqual(
+            self.render('{% button color="secondary" class="foo" %}{% endbutton %}'),
+            '<button class="btn-secondary btn-md foo" data-href="#">None</button>'
+        )
+        self.assertEqual(
+            self.render('{% button color="secondary" class=foo %}{% endbutton %}', foo='foo'),
+            '<button class="btn-secondary btn-md foo" data-href="#">None</button>'
+        )
+        self.assertEqual(
+            self.render('{% button foo=foo bar="bar" %}{% endbutton %}', foo='foo'),
+            self.render('{% button foo="foo" bar=bar %}{% endbutton %}', bar='bar'),
+        )
+
+    def test_render_invalid_choice(self):
+        with self.assertRaises(Attribute.ChoiceDoesNotExist):
+            self.render('{% button color="danger" %}{% endbutton %}')
+
+    def test_render_does_not_change_attributes(self):
+        self.render('{% button %}{% endbutton %}')
+        self.assertIsNone(self.Button.title.context_name)
+
+
+class RenderToStringTestCase(TestCase):
+
+    def setUp(self):
+        class Card(template.Component):
+            title = template.Attribute(as_context=True, required=True)
+            color = template.Attribute(default='gray', as_class=True)
+
+            class Meta:
+                template_name = 'card.html'
+                css = {'all': ['card.css']}
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                js = ['icon.js']
+
+        self.Card = Card
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        self.settings = override_settings(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'OPTIONS': {
+                'loaders': [('django.template.loaders.locmem.Loader', {
+                    'card.html': '<div {{ attributes }}><h1>{{ title }}</h1>{{ slot_footer }}{{ nodelist }}'
+                                 '{% icon %}{% endicon %}{{ request.path }}{{ page }}</div>',
+                    'icon.html': '<i></i>',
+                })],
+            },
+        }])
+        self.settings.enable()
+        Engine.get_default().template_builtins.append(library)
+
+    def tearDown(self):
+        self.settings.disable()
+
+    def test_render_to_string(self):
+        request = RequestFactory().get('/cards/')
+        output = self.Card.render_to_string(
+            request=request, title='<Card>', color='red', id=1, nodelist='<b>', slots={'footer': mark_safe('<hr>')},
+            options={'page': 2},
+        )
+        self.assertIsInstance(output, SafeString)
+        self.assertEqual(
+            output, '<div class="red" id="1"><h1>&lt;Card&gt;</h1><hr>&lt;b&gt;<i></i>/cards/2</div>',
+        )
+        self.assertEqual(
+            str(output.media),
+            '<link href="/static/card.css" type="text/css" media="all" rel="stylesheet">\n' + js_tag('icon.js'),
+        )
+
+    def test_same_output_as_template(self):
+        engine = Engine.get_default()
+        source = '{% card title=title id=1 %}x{% endcard %}'
+        self.assertEqual(
+            self.Card.render_to_string({'ignored': 1}, title='Card', id=1, nodelist='x'),
+            engine.from_string(source).render(Context({'title': 'Card'})),
+        )
+
+    def test_attributes_are_checked(self):
+        with self.assertRaises(Attribute.RequiredValue):
+            self.Card.render_to_string(title=None)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                        'LOCATION': 'component_tags'}})
+class CacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        pure_cache.clear()
+        self.rendered = []
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                js = ['icon.js']
+
+        class Navbar(template.Component):
+            active = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'navbar.html'
+                css = {'all': ['navbar.css']}
+                cache = {'timeout': 60, 'vary_on': ['user']}
+
+        class Badge(template.Component):
+            label = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'badge.html'
+                pure = True
+
+        library = template.Library()
+        library.tag('icon', Icon)
+        library.tag('navbar', Navbar)
+        library.tag('badge', Badge)
+
+        @library.simple_tag
+        def probe(name):
+            self.rendered.append(name)
+            return name
+
+        self.Navbar = Navbar
+        self.Badge = Badge
+        self.engine = make_engine({
+            'navbar.html': '<nav>{% probe active %}{% icon %}{% endicon %}{{ nodelist }}</nav>',
+            'icon.html': '<i></i>',
+            'badge.html': '<b>{% probe label %}{% icon %}{% endicon %}</b>',
+        }, library)
+
+    def render(self, source, **kwargs):
+        return self.engine.from_string(source).render(Context(kwargs))
+
+    def test_meta(self):
+        self.assertEqual(self.Navbar.meta.cache.timeout, 60)
+        self.assertEqual(self.Navbar.meta.cache.vary_on, ['user'])
+
+        class Sidebar(self.Navbar):
+            class Meta:
+                template_name = 'sidebar.html'
+
+        self.assertIs(Sidebar.meta.cache, self.Navbar.meta.cache)
+
+    def test_render_is_cached(self):
+        source = '{% navbar active=active %}{{ title }}{% endnavbar %}'
+        self.assertEqual(self.render(source, active='home', title='Foo'), '<nav>home<i></i></nav>')
+        self.assertEqual(self.render(source, active='home', title='Foo'), '<nav>home<i></i></nav>')
+        self.assertEqual(self.rendered, ['home'])
+
+        self.render(source, active='blog')
+        self.render(source, active='blog', user='bar')
+        self.assertEqual(self.rendered, ['home', 'blog', 'blog'])
+
+    def test_render_depends_on_nodelist(self):
+        source = '{% navbar active="home" with title=title %}{{ title }}{% endnavbar %}'
+        self.assertEqual(self.render(source, title='Foo'), '<nav>home<i></i>Foo</nav>')
+        self.assertEqual(self.render(source, title='Bar'), '<nav>home<i></i>Bar</nav>')
+        self.assertEqual(self.render(source, title='Bar'), '<nav>home<i></i>Bar</nav>')
+        self.assertEqual(self.rendered, ['home', 'home'])
+
+    def test_render_media_is_replayed(self):
+        source = '{% components_css %}{% navbar active="home" %}{% endnavbar %}{% components_js %}'
+        self.render(source)
+        output = self.render(source)
+
+        self.assertEqual(self.rendered, ['home'])
+        self.assertEqual(
+            output,
+            '<link href="/static/navbar.css" type="text/css" media="all" rel="stylesheet">'
+            '<nav>home<i></i></nav>' + js_tag('icon.js')
+        )
+
+    def test_pure_render(self):
+        source = '{% for label in labels %}{% badge label=label %}{% endbadge %}{% endfor %}{% components_js %}'
+        self.render(source, labels=['a', 'b'])
+        output = self.render(source, labels=['b', 'a'])
+
+        self.assertEqual(output, '<b>b<i></i></b><b>a<i></i></b>' + js_tag('icon.js'))
+        self.assertEqual(self.rendered, ['a', 'b'])
+        self.assertEqual(pure_cache.stats, {'entries': 2, 'bytes': pure_cache.bytes, 'hits': 2, 'misses': 2,
+                                            'evictions': 0})
+
+        # Only strings, numbers and None are memoized
+        self.render('{% badge label=label %}{% endbadge %}', label=['c'])
+        self.render('{% badge label=label %}{% endbadge %}', label=('c',))
+        self.render('{% badge label=label %}{% endbadge %}', label=('c',))
+        self.assertEqual(self.rendered, ['a', 'b', ['c'], ('c',), ('c',)])
+        self.assertEqual(len(pure_cache), 2)
+
+    def test_pure_render_keys(self):
+        source = '{% load i18n %}{% badge label=label %}{% endbadge %}{% language "fr" %}{% badge label=label %}' \
+                 '{% endbadge %}{% endlanguage %}'
+        self.engine.template_libraries['i18n'] = i18n.register
+        for label in (1, True, 1.0, 1):
+            self.render(source, label=label)
+
+        self.assertEqual(self.rendered, [1, 1, True, True, 1.0, 1.0])
+        self.assertEqual(pure_cache.stats['hits'], 2)
+
+    def test_pure_render_template(self):
+        class Choice(self.Badge):
+            def get_template(self, context):
+                # Parent context value, not an input of the component
+                return f'{context["kind"]}.html'
+
+        library = template.Library()
+        library.tag('choice', Choice)
+        self.engine = make_engine({'a.html': 'A', 'b.html': 'B'}, library)
+
+        output = ''.join(self.render('{% choice %}{% endchoice %}', kind=kind) for kind in 'aba')
+        self.assertEqual(output, 'ABA')
+        self.assertEqual(pure_cache.stats['hits'], 1)
+
+    def test_pure_cache_eviction(self):
+        lru = PureCache(max_size=2, max_bytes=1000)
+        lru.set('a', ('a', ()))
+        lru.set('b', ('b', ()))
+        lru.get('a')
+        lru.set('c', ('c', ()))
+
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), ('a', ()))
+        self.assertEqual(lru.stats['evictions'], 1)
+
+        lru.set('d', ('d' * 1000, ()))
+        self.assertIsNone(lru.get('d'))
+        self.assertLessEqual(lru.bytes, 1000)
+
+        lru.clear()
+        self.assertEqual(lru.stats, {'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0})
+
+    def test_pure_cache_settings(self):
+        with self.settings(COMPONENT_TAGS_PURE_CACHE_SIZE=1):
+            for label in ('a', 'b', 'a'):
+                self.render('{% badge label=label %}{% endbadge %}', label=label)
+        self.assertEqual(self.rendered, ['a', 'b', 'a'])
+        self.assertEqual(len(pure_cache), 1)
+
+
+class DedupeTestCase(TestCase):
+
+    def setUp(self):
+        self.rendered = []
+
+        class Tag(template.Component):
+            label = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'tag.html'
+                js = ['tag.js']
+
+        library = template.Library()
+        library.tag('tag', Tag)
+
+        @library.simple_tag
+        def probe(name):
+            self.rendered.append(name)
+            return name
+
+        self.Tag = Tag
+        self.library = library
+        self.engine = make_engine({'tag.html': '<span>{% probe label %}{{ nodelist }}</span>'}, library)
+
+    def render(self, source, **kwargs):
+        context = Context(kwargs)
+        return self.engine.from_string(source).render(context), context
+
+    def test_identical_renders(self):
+        output, context = self.render(
+            '{% for label in labels %}{% tag label=label %}{% endtag %}{% endfor %}{% components_js %}',
+            labels=['a', 'b', 'a', 'a'],
+        )
+        self.assertEqual(output, '<span>a</span><span>b</span><span>a</span><span>a</span>' + js_tag('tag.js'))
+        self.assertEqual(self.rendered, ['a', 'b'])
+
+        memo = get_render_memo(context)
+        self.assertEqual((len(memo), memo.hits, memo.misses), (2, 2, 2))
+
+        # The memo only lives during the template rendering
+        self.render('{% tag label="a" %}{% endtag %}')
+        self.assertEqual(self.rendered, ['a', 'b', 'a'])
+
+    def test_objects_are_compared_by_identity(self):
+        first, second = ['a'], ['a']
+        self.render('{% tag label=first %}{% endtag %}{% tag label=first %}{% endtag %}'
+                    '{% tag label=second %}{% endtag %}', first=first, second=second)
+        self.assertEqual(self.rendered, [first, second])
+
+    def test_values_are_compared_by_type(self):
+        output, context = self.render(
+            '{% for label in labels %}{% tag label=label %}{% endtag %}{% endfor %}', labels=[1, True, 1.0, 1],
+        )
+        self.assertEqual(output, '<span>1</span><span>True</span><span>1.0</span><span>1</span>')
+        self.assertEqual(self.rendered, [1, True, 1.0])
+
+    def test_nodelist(self):
+        output, context = self.render(
+            '{% for i in items %}{% tag label="a" with i=i %}{{ i }}{% endtag %}{% tag label="a" %}x{% endtag %}'
+            '{% endfor %}', items=[1, 2, 1],
+        )
+        self.assertEqual(output, '<span>a1</span><span>ax</span><span>a2</span><span>ax</span>'
+                                 '<span>a1</span><span>ax</span>')
+        self.assertEqual(self.rendered, ['a', 'a', 'a'])
+
+    def test_stateful_nodelist(self):
+        output, context = self.render(
+            '{% for i in items %}{% tag label="a" %}{% cycle "x" "y" %}{% endtag %}{% endfor %}', items=[1, 2],
+        )
+        self.assertEqual(output, '<span>ax</span><span>ay</span>')
+
+    def test_language_and_timezone(self):
+        class Lang(self.Tag):
+            class Meta:
+                template_name = 'lang.html'
+
+        self.library.tag('lang', Lang)
+        self.engine = make_engine({
+            'lang.html': '{% load i18n tz %}{% get_current_language as language %}{% get_current_timezone as tz %}'
+                         '{{ label }}:{{ language }}:{{ tz }} ',
+        }, self.library)
+        self.engine.template_libraries.update(i18n=i18n.register, tz=tz.register)
+        with translation.override('de'):
+            output, context = self.render(
+                '{% load i18n tz %}{% lang label=1 %}{% endlang %}{% language "fr" %}{% lang label=1 %}{% endlang %}'
+                '{% endlanguage %}{% timezone "Europe/Paris" %}{% lang label=1 %}{% endlang %}{% endtimezone %}'
+                '{% lang label=1 %}{% endlang %}',
+            )
+        self.assertEqual(output, '1:de:UTC 1:fr:UTC 1:de:Europe/Paris 1:de:UTC ')
+        self.assertEqual(get_render_memo(context).hits, 1)
+
+    def test_resolved_template(self):
+        class Choice(self.Tag):
+            def get_template(self, context):
+                # Parent context value, not an input of the component
+                return f'{context["kind"]}.html'
+
+        self.library.tag('choice', Choice)
+        self.engine = make_engine({'a.html': 'A', 'b.html': 'B'}, self.library)
+        output, context = self.render(
+            '{% for kind in kinds %}{% choice %}{% endchoice %}{% endfor %}', kinds=['a', 'b', 'a'],
+        )
+        self.assertEqual(output, 'ABA')
+        self.assertEqual(get_render_memo(context).hits, 1)
+
+    def test_disabled(self):
+        class Label(self.Tag):
+            class Meta:
+                dedupe = False
+
+        class Title(self.Tag):
+            def get_context_data(self, context):
+                return super().get_context_data(context)
+
+        self.library.tag('label', Label)
+        self.library.tag('title', Title)
+        self.render('{% label label="a" %}{% endlabel %}{% label label="a" %}{% endlabel %}'
+                    '{% title label="b" %}{% endtitle %}{% title label="b" %}{% endtitle %}')
+        self.assertEqual(self.rendered, ['a', 'a', 'b', 'b'])
+
+    def test_nested_disabled(self):
+        class Uid(template.Component):
+            class Meta:
+                template_name = 'uid.html'
+                dedupe = False
+
+        class Field(self.Tag):
+            class Meta:
+                template_name = 'field.html'
+
+        counter = itertools.count(1)
+        self.library.tag('uid', Uid)
+        self.library.tag('field', Field)
+        self.library.simple_tag(lambda: f'id{next(counter)}', name='next_id')
+        self.engine = make_engine({'uid.html': '{% next_id %}', 'field.html': '[{% uid %}{% enduid %}]'}, self.library)
+
+        source = '{% field label="a" %}{% endfield %}{% field label="a" %}{% endfield %}'
+        output, context = self.render(source)
+        self.assertEqual(output, '[id1][id2]')
+        self.assertEqual(len(get_render_memo(context)), 0)
+
+        self.assertEqual(''.join(stream(self.engine.from_string(source))), '[id3][id4]')
+
+
+    def test_slots(self):
+        class CustomContext(ComponentContext):
+            pass
+
+        context = ComponentContext(NodeList(), initial=Context())
+        self.assertFalse(hasattr(context, '__dict__'))
+        context.close()
+
+        with CustomContext(NodeList(), initial=Context()) as context:
+            context.extra = 'foo'
+            self.assertEqual(context.extra, 'foo')
+
+    def test_component_context_frame(self):
+        context = Context({'foo': 'bar'})
+        dicts = context.dicts
+
+        with ComponentContext(NodeList(), initial=context, baz='qux') as component_context:
+            frame = component_context.clean()
+            self.assertIsNot(frame, context)
+            self.assertNotIn('foo', frame)
+            self.assertEqual(frame['baz'], 'qux')
+            self.assertIs(frame.render_context, context.render_context)
+            self.assertEqual(context['foo'], 'bar')
+
+        self.assertIs(context.dicts, dicts)
+        self.assertEqual(context.flatten(), {'True': True, 'False': False, 'None': None, 'foo': 'bar'})
+
+    def test_component_context_frame_not_isolated(self):
+        context = Context({'foo': 'bar'})
+
+        with ComponentContext(NodeList(), initial=context, isolated=False, baz='qux') as component_context:
+            frame = component_context.clean()
+            self.assertEqual((frame['foo'], frame['baz']), ('bar', 'qux'))
+
+        self.assertNotIn('baz', context)
+
+    def test_get_context_data_reads_parent_context(self):
+        class Profile(template.Component):
+            class Meta:
+                template_name = 'profile.html'
+
+            def get_context_data(self, context):
+                component_context = super().get_context_data(context)
+                component_context['user'] = context['user']
+                return component_context
+
+        library = template.Library()
+        library.tag('profile', Profile)
+
+        engine = make_engine({'profile.html': '[{{ user }}]'}, library)
+
+        output = engine.from_string('{% profile %}{% endprofile %}{{ user }}').render(Context({'user': 'bob'}))
+
+        self.assertEqual(output, '[bob]bob')
+
+    def test_render_restores_context(self):
+        class Card(template.Component):
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'card.html'
+
+        library = template.Library()
+        library.tag('card', Card)
+
+        @library.simple_tag
+        def fail():
+            raise ValueError
+
+        engine = make_engine({'card.html': '[{{ title }}{{ nodelist }}{{ missing|default:"" }}]'}, library)
+
+        context = Context({'title': 'page', 'missing': 'no'})
+        dicts = context.dicts
+        output = engine.from_string(
+            '{% card title="a" %}{% card title=title %}{{ title }}{% endcard %}{% endcard %}{{ title }}'
+        ).render(context)
+
+        self.assertEqual(output, '[a[aa]]page')
+        self.assertIs(context.dicts, dicts)
+        self.assertEqual(len(context.dicts), 2)
+
+        with self.assertRaises(ValueError):
+            engine.from_string('{% card %}{% fail %}{% endcard %}').render(context)
+        self.assertIs(context.dicts, dicts)
 
 
 class HelperTestCase(TestCase):
@@ -132,15 +1159,590 @@ class HelperTestCase(TestCase):
 
 
 class LibraryTestCase(TestCase):
-    pass
+
+    def setUp(self):
+        class Alert(template.Component):
+            color = template.Attribute(default='info')
+
+            class Meta:
+                template_name = 'alert.html'
+                css = {'all': ['alert.css']}
+
+        class Badge(template.Component):
+            class Meta:
+                template_name = 'badge.html'
+
+        self.Alert = Alert
+        self.Badge = Badge
+
+    def test_registry(self):
+        library = template.Library('alerts')
+        library.tag('alert', self.Alert)
+
+        @library.tag
+        class Notice(self.Alert):
+            pass
+
+        entry = registry.get('alert')
+        self.assertEqual((entry.tag_name, entry.library, entry.component), ('alert', library, self.Alert))
+        self.assertIs(entry.compile_function, library.tags['alert'])
+        self.assertEqual(entry.template_name, 'alert.html')
+        self.assertEqual(list(entry.attributes), ['color'])
+        self.assertEqual(entry.media._css, {'all': ['alert.css']})
+        self.assertIs(registry.get('alert', 'alerts'), entry)
+        self.assertIs(registry.get('alert', library), entry)
+        self.assertIsNone(registry.get('alert', 'missing'))
+        self.assertIn('notice', registry)
+        self.assertEqual([entry.tag_name for entry in registry.get_library(library)], ['alert', 'notice'])
+        self.assertEqual(template.Library().name, __name__)
+
+    def test_registry_collisions(self):
+        library, other = template.Library('alerts'), template.Library('other')
+        library.tag('alert', self.Alert)
+        other.tag('alert', self.Badge)
+        self.assertIs(registry.get('alert').component, self.Badge)
+        self.assertIs(registry.get('alert', library).component, self.Alert)
+
+        # Registering the tag again replaces the component, any other tag removes it
+        library.tag('alert', self.Badge)
+        self.assertIs(registry.get('alert').library, library)
+        self.assertEqual(len(registry.get_component(self.Alert)), 0)
+        other.tag('alert', lambda parser, token: None)
+        library.tag('alert', lambda parser, token: None)
+        self.assertIsNone(registry.get('alert'))
+
+    def test_registry_references(self):
+        library = template.Library('alerts')
+        library.tag('alert', self.Alert)
+        del library
+        gc.collect()
+        self.assertIsNone(registry.get('alert'))
+
+
+class LoadingTestCase(TestCase):
+
+    def setUp(self):
+        class Alert(template.Component):
+            class Meta:
+                template_name = 'alert.html'
+
+        self.Alert = Alert
+        self.templates = {'alert.html': '<div></div>', 'danger.html': '<div class="danger"></div>'}
+        self.engine = Engine(loaders=[('django.template.loaders.locmem.Loader', self.templates)])
+
+    def test_get_template(self):
+        cache = TemplateCache()
+        template = cache.get_template(self.engine, 'alert.html')
+        self.assertIsNot(template, self.engine.get_template('alert.html'))
+        self.assertIs(template, cache.get_template(self.engine, 'alert.html'))
+        self.assertIs(cache.select_template(self.engine, ['missing.html', 'danger.html']),
+                      cache.select_template(self.engine, ('missing.html', 'danger.html')))
+        self.assertEqual(len(cache), 2)
+
+    def test_cached_loader_reset(self):
+        engine = Engine(loaders=[
+            ('django.template.loaders.cached.Loader', [('django.template.loaders.locmem.Loader', self.templates)]),
+        ])
+        cache = TemplateCache()
+        template = cache.get_template(engine, 'alert.html')
+        self.assertIs(template, cache.get_template(engine, 'alert.html'))
+
+        engine.template_loaders[0].reset()
+        self.assertIsNot(template, cache.get_template(engine, 'alert.html'))
+
+    def test_reset_template_caches(self):
+        cache = TemplateCache()
+        template = cache.get_template(self.engine, 'alert.html')
+
+        file_changed.send(sender=None, file_path=Path('alert.html'))
+        self.assertEqual(len(cache), 0)
+        self.assertIsNot(template, cache.get_template(self.engine, 'alert.html'))
+
+        reset_template_caches()
+        self.assertEqual(len(cache), 0)
+
+    def test_component_templates(self):
+        class Danger(self.Alert):
+            def get_template(self, context):
+                return ['missing.html', 'danger.html']
+
+        self.engine.template_builtins.append(template.Library())
+        self.engine.template_builtins[-1].tag('alert', self.Alert)
+        self.engine.template_builtins[-1].tag('danger', Danger)
+
+        output = self.engine.from_string('{% alert %}{% endalert %}{% danger %}{% enddanger %}').render(Context())
+        self.assertEqual(output, '<div></div><div class="danger"></div>')
+        self.assertEqual(len(self.Alert._template_cache), 1)
+        self.assertEqual(len(Danger._template_cache), 1)
+
+    def test_warm(self):
+        class Missing(self.Alert):
+            class Meta:
+                template_name = 'missing.html'
+
+        library = template.Library()
+        library.tag('alert', self.Alert)
+        library.tag('missing', Missing)
+        self.engine.template_libraries['alerts'] = library
+
+        result = warm([self.engine])
+        self.assertEqual((result.components, result.templates, result.frozen), (2, 1, False))
+        self.assertEqual([name for name, error in result.errors], ['missing'])
+        self.assertEqual(len(self.Alert._template_cache), 1)
+        self.assertIsNotNone(get_references(self.Alert._template_cache.get_template(self.engine, 'alert.html')))
+
+    @override_settings(TEMPLATES=[{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+        'OPTIONS': {'builtins': ['component_tags.template.builtins']},
+    }])
+    def test_warm_components_command(self):
+        output = StringIO()
+        call_command('warm_components', '--strict', stdout=output)
+        self.assertRegex(output.getvalue(), r'Loaded 1 components \(1 templates\)')
+
+
+class MediaTestCase(TestCase):
+
+    def setUp(self):
+        class Card(template.Component):
+            class Meta:
+                template_name = 'card.html'
+                css = {'all': ['card.css']}
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                js = ['icon.js']
+
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        self.Card, self.Icon = Card, Icon
+        self.engine = make_engine({
+            'card.html': '<div>{% icon %}{% endicon %}{{ nodelist }}</div>',
+            'icon.html': '<i></i>',
+        }, library)
+
+    def test_collector(self):
+        collector = MediaCollector()
+        collector.add(self.Card, self.Card.meta)
+        collector.add(self.Card, self.Card.meta)
+        collector.add(self.Icon, self.Icon.meta)
+
+        self.assertEqual(len(collector), 2)
+        self.assertIs(collector.media, collector.media)
+        self.assertEqual(collector.media._js, ['icon.js'])
+        self.assertEqual(collector.stats, {'added': 3, 'unique': 2, 'duplicates': 1, 'merges': 1})
+
+    def test_render_media(self):
+        context = Context({'items': [1, 2]})
+        output = self.engine.from_string(
+            '{% components_css %}{% for i in items %}{% card %}{% icon %}{% endicon %}{% endcard %}{% endfor %}'
+            '{% components_js %}'
+        ).render(context)
+
+        self.assertEqual(
+            output,
+            '<link href="/static/card.css" type="text/css" media="all" rel="stylesheet">'
+            '<div><i></i><i></i></div><div><i></i><i></i></div>' + js_tag('icon.js')
+        )
+        self.assertEqual(get_media_collector(context).stats,
+                         {'added': 6, 'unique': 2, 'duplicates': 4, 'merges': 1})
 
 
 class NodeTestCase(TestCase):
     pass
 
 
+class ProfilingTestCase(TestCase):
+
+    def setUp(self):
+        class Card(template.Component):
+            class Meta:
+                template_name = 'card.html'
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        self.engine = make_engine({
+            'card.html': '<div>{% icon %}{% endicon %}{{ nodelist }}</div>',
+            'icon.html': '<i></i>',
+        }, library)
+        self.template = self.engine.from_string('{% card %}{% icon %}{% endicon %}{% endcard %}{% icon %}{% endicon %}')
+
+    def test_observers(self):
+        calls = []
+
+        class Observer(RenderObserver):
+            def __init__(self, name):
+                self.name = name
+
+            def observe(self, node, context, render):
+                calls.append((self.name, node.tag_name))
+                return super().observe(node, context, render)
+
+        self.assertIsNone(get_observer())
+        with observing(Observer('outer')) as outer:
+            with observing(Observer('inner')):
+                self.engine.from_string('{% icon %}{% endicon %}').render(Context())
+            self.assertIs(get_observer(), outer)
+        self.assertIsNone(get_observer())
+        self.assertEqual(calls, [('inner', 'icon'), ('outer', 'icon')])
+
+    def test_profile_tree(self):
+        with observing(RenderProfiler()) as profiler:
+            self.template.render(Context())
+
+        card, icon = profiler.entries
+        self.assertEqual((card.name, card.template_name, card.child_renders), ('card', 'card.html', 2))
+        self.assertEqual([child.name for child in card.children], ['icon', 'icon'])
+        self.assertEqual((icon.name, icon.child_renders), ('icon', 0))
+        self.assertTrue(card.component.endswith('Card'))
+        self.assertLessEqual(card.exclusive, card.inclusive)
+        self.assertAlmostEqual(profiler.total, card.inclusive + icon.inclusive)
+
+        data = json.loads(profiler.to_json())
+        self.assertEqual([entry['name'] for entry in data['components']], ['card', 'icon'])
+        self.assertEqual(data['components'][0]['child_renders'], 2)
+
+        stacks = [line.rsplit(' ', 1)[0] for line in profiler.folded().splitlines()]
+        self.assertEqual(stacks, ['card', 'icon', 'card;icon'])
+
+    def test_middleware(self):
+        request = RequestFactory().get('/foo/')
+
+        with self.assertRaises(MiddlewareNotUsed):
+            ComponentProfilerMiddleware(lambda r: HttpResponse())
+
+        with override_settings(COMPONENT_TAGS_PROFILE=True):
+            middleware = ComponentProfilerMiddleware(lambda r: HttpResponse(self.template.render(Context())))
+            with self.assertLogs('component_tags.profiling', 'DEBUG'):
+                middleware(request)
+
+        self.assertEqual(len(request.component_profile.entries), 2)
+
+
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        class Card(template.Component):
+            class Meta:
+                template_name = 'card.html'
+                css = {'all': ['card.css']}
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                slow_render_ms = 0
+
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        self.engine = make_engine({
+            'card.html': '<div>{% icon %}{% endicon %}{{ nodelist }}</div>',
+            'icon.html': '<i></i>',
+        }, library)
+        self.template = self.engine.from_string(
+            '{% card %}{% icon %}{% endicon %}{% endcard %}{% components_css %}'
+        )
+
+    def test_recorder(self):
+        exporter = PrometheusExporter()
+
+        with self.assertLogs('component_tags.metrics', 'WARNING') as logs:
+            with observing(MetricsRecorder(exporter)) as recorder:
+                self.template.render(Context())
+        self.assertEqual(len(logs.records), 2)
+        self.assertTrue(all('[icon]' in line for line in logs.output))
+
+        card = next(metrics for component, metrics in recorder.components.items() if component.__name__ == 'Card')
+        icon = next(metrics for component, metrics in recorder.components.items() if component.__name__ == 'Icon')
+        self.assertEqual((card.renders, card.slow_renders, sum(card.buckets)), (1, 0, 1))
+        self.assertEqual((icon.renders, icon.slow_renders), (2, 2))
+        self.assertEqual(icon.cache, {('dedupe', False): 1, ('dedupe', True): 1})
+        self.assertEqual(recorder.media_merges, 1)
+
+        recorder.flush()
+        self.assertEqual(recorder.components, {})
+        snapshot = exporter.snapshot()
+        self.assertEqual(snapshot['requests'], 1)
+        self.assertEqual(snapshot['media_merges'], 1)
+
+        output = exporter.render()
+        self.assertIn('component_tags_sampled_requests_total 1', output)
+        self.assertRegex(output, r'component_tags_render_seconds_count\{component="[^"]+Icon"\} 2')
+        self.assertRegex(output, r'component_tags_render_seconds_bucket\{component="[^"]+Icon",le="\+Inf"\} 2')
+        self.assertRegex(output, r'component_tags_cache_lookups_total\{component="[^"]+Icon",'
+                                 r'cache="dedupe",result="hit"\} 1')
+
+        exporter.reset()
+        self.assertEqual(exporter.snapshot()['components'], {})
+
+    def test_middleware(self):
+        request = RequestFactory().get('/foo/')
+        get_response = lambda r: HttpResponse(self.template.render(Context()))  # noqa: E731
+
+        with self.assertRaises(MiddlewareNotUsed):
+            ComponentMetricsMiddleware(get_response)
+
+        # A new (default) exporter is created when the setting changes
+        with override_settings(COMPONENT_TAGS_METRICS_EXPORTER=None):
+            exporter = get_exporter()
+
+            with override_settings(COMPONENT_TAGS_METRICS_SAMPLE_RATE=1), \
+                    self.assertLogs('component_tags.metrics', 'WARNING'):
+                ComponentMetricsMiddleware(get_response)(request)
+            self.assertEqual(exporter.snapshot()['requests'], 1)
+
+            with override_settings(COMPONENT_TAGS_METRICS_SAMPLE_RATE=1e-12):
+                ComponentMetricsMiddleware(get_response)(request)
+            self.assertEqual(exporter.snapshot()['requests'], 1)
+
+            response = metrics(request)
+            self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+            self.assertIn(b'component_tags_sampled_requests_total 1', response.content)
+
+
+class ParallelTestCase(TestCase):
+
+    def setUp(self):
+        renders = self.renders = []
+        # Every widget of the grid waits for the others, it only works if they are rendered at the same time
+        barrier = threading.Barrier(4, timeout=5)
+
+        class Grid(template.Component):
+            class Meta:
+                template_name = 'grid.html'
+                parallel = True
+
+        class Widget(template.Component):
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'widget.html'
+                css = {'all': ['widget.css']}
+
+            def get_context_data(self, context):
+                thread = threading.current_thread().name
+                renders.append((thread, translation.get_language(), timezone.get_current_timezone_name()))
+                if thread.startswith('component_tags'):
+                    barrier.wait()
+                return super().get_context_data(context)
+
+        class Chart(Widget):
+            class Meta:
+                css = {'all': ['chart.css']}
+
+        class Sequential(Grid):
+            class Meta:
+                parallel = False
+
+        library = template.Library()
+        library.tag('grid', Grid)
+        library.tag('sequential', Sequential)
+        library.tag('widget', Widget)
+        library.tag('chart', Chart)
+        self.engine = make_engine({
+            'grid.html': '<div>{{ nodelist }}</div>',
+            'widget.html': '<p>{{ title }}</p>',
+        }, library)
+
+    def render(self, tag):
+        return self.engine.from_string(
+            '{% components_css %}{% ' + tag + ' with items=items %}{% for item in items %}'
+            '{% chart title=item %}{% endchart %}'
+            '{% widget title=item|upper %}{% endwidget %}{% endfor %}-{% end' + tag + ' %}'
+        ).render(Context({'items': ['a', 'b']}))
+
+    @override_settings(COMPONENT_TAGS_PARALLEL_WORKERS=4)
+    def test_parallel(self):
+        with mock.patch.object(parallel, 'close_old_connections') as close_old_connections:
+            output = self.render('grid')
+        self.assertEqual(len(self.renders), 4)
+        self.assertTrue(all(thread.startswith('component_tags') for thread, *_ in self.renders))
+        self.assertEqual(close_old_connections.call_count, 8)  # before and after every component
+
+        self.assertEqual(output, self.render('sequential'))
+        self.assertEqual(
+            output,
+            '<link href="/static/widget.css" type="text/css" media="all" rel="stylesheet">'
+            '<link href="/static/chart.css" type="text/css" media="all" rel="stylesheet">'
+            '<div><p>a</p><p>A</p><p>b</p><p>B</p>-</div>',
+        )
+
+    def test_language_and_timezone(self):
+        with translation.override('de'), timezone.override('Europe/Paris'):
+            self.render('grid')
+        self.assertEqual({values[1:] for values in self.renders}, {('de', 'Europe/Paris')})
+
+
 class ParserTestCase(TestCase):
-    pass
+
+    def setUp(self):
+        class Button(template.Component):
+            class ColorChoices(template.AttributeChoices):
+                primary = 'btn-primary'
+
+            color = template.Attribute(choices=ColorChoices, as_class=True)
+            href = template.Attribute(default='#', context_name='data-href')
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'button.html'
+
+        library = template.Library()
+        library.tag('button', Button)
+        self.engine = make_engine({}, library)
+
+    def get_plan(self, source):
+        return self.engine.from_string(source).nodelist[0].plan
+
+    def test_plan_bindings(self):
+        plan = self.get_plan('{% button title=title id="foo" with bar=baz %}{% endbutton %}')
+        self.assertEqual(
+            [(binding.kind, binding.key, binding.is_literal) for binding in plan.bindings],
+            [
+                (ComponentPlan.CLASS, 'color', True),
+                (ComponentPlan.ATTRIBUTE, 'data-href', True),
+                (ComponentPlan.CONTEXT, 'title', False),
+                (ComponentPlan.ATTRIBUTE, 'id', True),
+                (ComponentPlan.CONTEXT, 'bar', False),
+            ]
+        )
+
+    def test_plan_literals(self):
+        plan = self.get_plan('{% button color="primary" id=1 title=_("Foo") data=foo|default:"bar" %}{% endbutton %}')
+        self.assertEqual([binding.value for binding in plan.literals], ['btn-primary', '#', 'Foo', 1])
+        self.assertEqual([binding.key for binding in plan.variables], ['data'])
+
+    def test_plan_static_attributes(self):
+        plan = self.get_plan('{% button color="primary" class="foo" id=1 title=title %}{% endbutton %}')
+        self.assertEqual(plan.static_attributes, {'class': ['btn-primary', 'foo'], 'data-href': '#', 'id': 1})
+        self.assertEqual(plan.attributes, 'class="btn-primary foo" data-href="#" id="1"')
+        self.assertEqual([binding.key for binding in plan.dynamic_bindings], ['title'])
+
+        # html attributes are merged in binding order when some of them are variables
+        plan = self.get_plan('{% button color="primary" class="foo" id=id title="Foo" %}{% endbutton %}')
+        self.assertEqual(plan.static_attributes, {})
+        self.assertEqual(
+            [binding.key for binding in plan.dynamic_bindings], ['color', 'data-href', 'title', 'class', 'id']
+        )
+
+    def test_plan_invalid_literal(self):
+        plan = self.get_plan('{% button color="danger" %}{% endbutton %}')
+        self.assertEqual([binding.key for binding in plan.variables], ['color'])
+
+
+class StreamingTestCase(TestCase):
+
+    def setUp(self):
+        rendered = self.rendered = []
+
+        class Card(template.Component):
+            title = template.Attribute(as_context=True)
+
+            class Meta:
+                template_name = 'card.html'
+                js = ['card.js']
+
+            def get_context_data(self, context):
+                rendered.append(self.tag_name)
+                return super().get_context_data(context)
+
+        class Icon(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                css = {'all': ['icon.css']}
+
+        class Late(template.Component):
+            class Meta:
+                template_name = 'icon.html'
+                css = {'all': ['late.css']}
+
+        library = template.Library()
+        library.tag('card', Card)
+        library.tag('icon', Icon)
+        library.tag('late', Late)
+        self.engine = make_engine({
+            'card.html': '<div>{{ title }}{% icon %}{% endicon %}{{ nodelist }}{% if slot_footer %}[{{ slot_footer }}]'
+                         '{% endif %}</div>',
+            'icon.html': '<i></i>',
+            'late.html': '{% late %}{% endlate %}',
+            'base.html': '<head>{% components_css %}</head>{% block content %}{% endblock %}{% components_js %}',
+            'page.html': '{% extends "base.html" %}{% block content %}{% for item in items %}'
+                         '{% with title=item|upper %}{% card title=title %}{{ forloop.counter }}{% card %}{% endcard %}'
+                         '{% slot "footer" %}{{ item }}{% endslot %}{% endcard %}{% endwith %}{% empty %}empty'
+                         '{% endfor %}{% endblock %}',
+        }, library)
+
+    def test_stream(self):
+        page = self.engine.get_template('page.html')
+        expected = page.render(Context({'items': ['a', 'b']}))
+
+        chunks = list(stream(page, Context({'items': ['a', 'b']}), chunk_size=0))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(''.join(chunks), expected)
+
+        # Media is predicted from every component which may be rendered after {% components_css %}
+        self.assertEqual(page.render(Context({'items': []})), '<head></head>empty')
+        self.assertEqual(
+            ''.join(stream(page, Context({'items': []}))),
+            '<head><link href="/static/icon.css" type="text/css" media="all" rel="stylesheet"></head>empty',
+        )
+
+    def test_same_output(self):
+        self.engine.template_loaders[0].templates_dict.update({
+            'layout.html': '{% extends "base.html" %}{% block content %}<main>{% block main %}main{% endblock %}'
+                           '</main>{% endblock %}',
+            'nested.html': '{% extends "layout.html" %}{% block main %}{{ block.super }}|{% include "rows.html" %}'
+                           '{% endblock %}',
+            'rows.html': '{% for key, values in rows %}{{ key }}:{% for value in values reversed %}'
+                         '{% cycle "x" "y" %}{{ forloop.parentloop.counter }}.{{ forloop.revcounter0 }}{{ value }}'
+                         '{% if forloop.last %};{% endif %}{% empty %}-{% endfor %}{% endfor %}',
+        })
+        values = {'items': ['a', 'b'], 'rows': [('a', [1, 2]), ('b', []), ('c', (3,))]}
+        cases = [(name, values) for name in ('page.html', 'layout.html', 'nested.html', 'rows.html')]
+        # Without items the media of page.html is predicted (see test_stream)
+        cases += [('nested.html', {}), ('rows.html', {'rows': []})]
+
+        for name, values in cases:
+            with self.subTest(name=name, values=values):
+                page = self.engine.get_template(name)
+                self.assertEqual(''.join(stream(page, Context(values))), page.render(Context(values)))
+
+                # Same output when the nodes are rendered at once (e.g. another Django version)
+                with mock.patch.dict(STREAMERS):
+                    for node_class in (ForNode, BlockNode, ExtendsNode):
+                        STREAMERS.pop(node_class, None)
+                    self.assertEqual(''.join(stream(page, Context(values))), page.render(Context(values)))
+
+    @skipUnless(ExtendsNode in STREAMERS, 'blocks are rendered at once with this Django version')
+    def test_first_chunk(self):
+        chunks = stream(self.engine.get_template('page.html'), Context({'items': ['a', 'b']}), chunk_size=0)
+        self.assertEqual(next(chunks), '<head>')
+        self.assertEqual(next(chunks), '<link href="/static/icon.css" type="text/css" media="all" rel="stylesheet">')
+        self.assertEqual(self.rendered, [])
+        self.assertEqual(next(chunks), '</head>')
+        self.assertEqual(next(chunks), '<div>')
+        self.assertEqual(self.rendered, ['card'])
+
+    def test_late_media(self):
+        page = self.engine.from_string('{% components_css %}{% icon %}{% endicon %}{% include "late.html" %}')
+        self.assertEqual(
+            ''.join(stream(page, Context())),
+            '<link href="/static/icon.css" type="text/css" media="all" rel="stylesheet"><i></i><i></i>'
+            '<link href="/static/late.css" type="text/css" media="all" rel="stylesheet">',
+        )
+
+    def test_stream_response(self):
+        response = stream_response(RequestFactory().get('/'), self.engine.from_string('{% icon %}{% endicon %}'))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(b''.join(response), b'<i></i>')
 
 
 class WrapperTestCase(TestCase):